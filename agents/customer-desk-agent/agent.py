@@ -1,15 +1,32 @@
 import os
+import re
+import json
+import math
+import sqlite3
+import time
 import datetime
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from zoneinfo import ZoneInfo
 from google.adk.agents import Agent, SequentialAgent
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
+from google.adk.artifacts import InMemoryArtifactService
 
 from google.adk.agents import LlmAgent
 from google.adk.models.lite_llm import LiteLlm
-from google.adk.tools import google_search
+from google.adk.tools import google_search, ToolContext
+from google.genai import types
 from serpapi import GoogleSearch
 
+import requests
+
+try:
+    import ijson  # Optional: streams SerpApi responses instead of parsing the whole payload
+except ImportError:
+    ijson = None
+
 # main.py
 from fastapi import FastAPI
 from pydantic import BaseModel
@@ -17,6 +34,416 @@ from pydantic import BaseModel
 
 serp_api_key = os.getenv("SERP_API_KEY")
 
+# Lets the load test (scripts/tests/load) point the tools at a local fake SerpApi
+if os.getenv("SERP_API_BACKEND"):
+    GoogleSearch.BACKEND = os.getenv("SERP_API_BACKEND")
+
+# ----- START: SHARED TOOL CACHE -----
+
+# SerpApi responses are shared across sessions for a short while, keyed on the
+# request params. Concurrent identical lookups wait on the same in-flight call.
+_TOOL_CACHE_TTL_SECONDS = int(os.getenv("TOOL_CACHE_TTL_SECONDS", "900"))
+_TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "512"))
+
+_tool_cache = OrderedDict()  # params key -> {"future", "expires_at", "prefetched", "used"}
+_tool_cache_lock = threading.Lock()
+_prefetch_context = threading.local()
+_prefetch_metrics = {"issued": 0, "hits": 0, "wasted": 0, "skipped": 0}
+
+
+# With TOOL_CACHE_PATH set, responses are also written through to a sqlite file, so
+# they survive restarts and can be warmed ahead of peak hours by scripts/warm_tool_cache.py
+_TOOL_CACHE_PATH = os.getenv("TOOL_CACHE_PATH")
+_tool_cache_db_local = threading.local()
+_serpapi_call_count = 0
+
+
+def _tool_cache_db():
+    connection = getattr(_tool_cache_db_local, "connection", None)
+    if connection is None:
+        connection = sqlite3.connect(_TOOL_CACHE_PATH, timeout=30)
+        connection.execute("CREATE TABLE IF NOT EXISTS tool_cache (key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)")
+        connection.execute("CREATE INDEX IF NOT EXISTS tool_cache_expires_at ON tool_cache (expires_at)")
+        _tool_cache_db_local.connection = connection
+    return connection
+
+
+def _load_persisted(key: str):
+    """Returns (payload, seconds left) from the sqlite cache, or None when missing or expired."""
+    if not _TOOL_CACHE_PATH:
+        return None
+    row = _tool_cache_db().execute("SELECT payload, expires_at FROM tool_cache WHERE key = ?", (key,)).fetchone()
+    if not row or row[1] < time.time():
+        return None
+    return json.loads(row[0]), row[1] - time.time()
+
+
+def _persist(key: str, payload: dict, ttl_seconds: float) -> None:
+    if not _TOOL_CACHE_PATH or "error" in payload or not any(payload.values()):
+        return  # Errors and empty results are worth asking SerpApi again for
+    now = time.time()
+    with _tool_cache_db() as connection:
+        connection.execute("DELETE FROM tool_cache WHERE expires_at < ?", (now,))  # keeps the file from growing with stale rows
+        connection.execute(
+            "INSERT OR REPLACE INTO tool_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(payload), now + ttl_seconds),
+        )
+
+
+def _tool_cache_key(params: dict) -> str:
+    # "Hotels in Goa" and "hotels in  goa" are the same lookup
+    return json.dumps({k: " ".join(v.lower().split()) if isinstance(v, str) else v for k, v in params.items() if k != "api_key"}, sort_keys=True)
+
+
+def _tool_cache_has(params: dict) -> bool:
+    key = _tool_cache_key(params)
+    with _tool_cache_lock:
+        entry = _tool_cache.get(key)
+        if entry and entry["expires_at"] >= time.monotonic() and not (entry["future"].done() and entry["future"].exception()):
+            return True
+    return _load_persisted(key) is not None
+
+
+def _drop_cache_entry(key: str) -> None:
+    entry = _tool_cache.pop(key)
+    if entry["prefetched"] and not entry["used"]:
+        _prefetch_metrics["wasted"] += 1
+
+
+def _serpapi_get_json(params: dict) -> dict:
+    global _serpapi_call_count
+    key = _tool_cache_key(params)
+    prefetching = getattr(_prefetch_context, "active", False)
+
+    with _tool_cache_lock:
+        entry = _tool_cache.get(key)
+        if entry and (entry["expires_at"] < time.monotonic() or (entry["future"].done() and entry["future"].exception())):
+            _drop_cache_entry(key)
+            entry = None
+
+        owner = entry is None
+        if owner:
+            entry = {"future": Future(), "expires_at": time.monotonic() + _TOOL_CACHE_TTL_SECONDS, "prefetched": prefetching, "used": False}
+            _tool_cache[key] = entry
+            if prefetching:
+                _prefetch_metrics["issued"] += 1
+            while len(_tool_cache) > _TOOL_CACHE_MAX_ENTRIES:
+                _drop_cache_entry(next(iter(_tool_cache)))
+        else:
+            _tool_cache.move_to_end(key)
+            if entry["prefetched"] and not entry["used"] and not prefetching:
+                entry["used"] = True
+                _prefetch_metrics["hits"] += 1
+
+    if owner:
+        try:
+            persisted = _load_persisted(key)
+            if persisted:
+                payload, seconds_left = persisted
+                entry["expires_at"] = time.monotonic() + min(seconds_left, _TOOL_CACHE_TTL_SECONDS)
+            else:
+                with _tool_cache_lock:
+                    _serpapi_call_count += 1
+                payload = _fetch_projected(params)
+                _persist(key, payload, _TOOL_CACHE_TTL_SECONDS)
+            entry["future"].set_result(payload)
+            if "error" in payload:
+                # Lookups already waiting share the error, the next one asks SerpApi again
+                with _tool_cache_lock:
+                    if _tool_cache.get(key) is entry:
+                        _drop_cache_entry(key)
+        except Exception as e:
+            entry["future"].set_exception(e)
+    return entry["future"].result()
+
+
+# The tools read ~10 fields per hotel/route, while SerpApi payloads also carry images,
+# review breakdowns, prices per provider, etc. Only the fields below are kept, and
+# with ijson installed the response is streamed one hotel/route at a time, so the full
+# payload is never built in memory.
+_HOTEL_FIELDS = {
+    "name": True, "link": True, "check_in_time": True, "check_out_time": True, "hotel_class": True,
+    "rate_per_night": {"lowest": True}, "overall_rating": True, "nearby_places": True, "gps_coordinates": True,
+}
+_DIRECTION_FIELDS = {
+    "travel_mode": True, "via": True, "distance": True, "duration": True, "formatted_distance": True,
+    "formatted_duration": True, "extensions": True, "cost": True, "currency": True, "trips": {"travel_mode": True},
+    "flight": {
+        "airlines": True, "departure": True, "arrival": True, "currency": True, "round_trip_price": True,
+        "nonstop_duration": True, "formatted_nonstop_duration": True, "google_flights_link": True,
+    },
+}
+_PAYLOAD_SCHEMAS = {  # engine -> (list key, fields kept per item)
+    "google_hotels": ("properties", _HOTEL_FIELDS),
+    "google_maps_directions": ("directions", _DIRECTION_FIELDS),
+}
+
+
+def _project(value, fields):
+    """Keeps only `fields` of value; lists are projected item by item."""
+    if fields is True:
+        return value
+    if isinstance(value, list):
+        return [_project(item, fields) for item in value]
+    if isinstance(value, dict):
+        return {key: _project(value[key], sub_fields) for key, sub_fields in fields.items() if key in value}
+    return value
+
+
+_STREAM_HEAD_BYTES = 256 * 1024
+
+
+class _HeadBuffer:
+    """Passes a byte stream through, keeping a copy of its first bytes.
+    A payload without any items ({"error": ...}, an empty list) is small enough to be parsed again from the copy."""
+
+    def __init__(self, stream, limit: int = _STREAM_HEAD_BYTES):
+        self.stream, self.limit, self.head, self.truncated = stream, limit, bytearray(), False
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        if not self.truncated:
+            self.head += data
+            if len(self.head) > self.limit:
+                self.head, self.truncated = bytearray(), True
+        return data
+
+
+def _stream_project(stream, list_key: str, fields: dict) -> dict:
+    """Projects the items of `list_key` one at a time from a JSON byte stream; the rest of the payload is skipped."""
+    stream = _HeadBuffer(stream)
+    items = [_project(item, fields) for item in ijson.items(stream, f"{list_key}.item", use_float=True)]
+    if items or stream.truncated:
+        return {list_key: items}
+    payload = json.loads(bytes(stream.head) or b"{}")
+    return {key: _project(value, fields) if key == list_key else value for key, value in payload.items() if key in (list_key, "error")}
+
+
+def _fetch_projected(params: dict) -> dict:
+    list_key, fields = _PAYLOAD_SCHEMAS.get(params.get("engine"), (None, None))
+    if list_key is None:
+        return GoogleSearch(params).get_json()
+    if ijson is None:
+        payload = GoogleSearch(params).get_json()
+        return {key: _project(value, fields) if key == list_key else value for key, value in payload.items() if key in (list_key, "error")}
+
+    # Same request GoogleSearch.get_json() makes, but the body is read as a stream
+    with requests.get(f"{GoogleSearch.BACKEND}/search", params={**params, "source": "python", "output": "json"}, stream=True, timeout=60) as response:
+        if response.status_code != 200:
+            return response.json()  # {"error": ...}
+        response.raw.decode_content = True
+        return _stream_project(response.raw, list_key, fields)
+
+# ----- END: SHARED TOOL CACHE -----
+
+# ----- START: SPECULATIVE PREFETCH -----
+
+# A route query for X->Y is nearly always followed by a hotels query for Y on the
+# same dates, and a hotels query for Y by the route there and back. After each of
+# those tool calls the likely next SerpApi lookup is fired on a small background
+# pool so it is already in the tool cache when asked.
+_HOTEL_TOOLS = {"search_hotels", "rank_hotels_by_proximity"}
+_ROUTE_TOOLS = {"search_map_directions", "search_directions_via_flight", "compare_transport_modes"}
+_PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", "8"))
+_PREFETCH_STAY_NIGHTS = int(os.getenv("PREFETCH_STAY_NIGHTS", "2"))  # assumed stay when the route message has a single date
+_DATE_PATTERN = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+_ORIGIN_PATTERN = re.compile(r"\bfrom\s+([A-Z][A-Za-z ]*?)(?=\s+(?:to|on)\b|[.,?!]|$)")
+
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+_prefetch_pending = threading.BoundedSemaphore(_PREFETCH_MAX_PENDING)
+
+
+def _run_prefetch(params: dict) -> None:
+    _prefetch_context.active = True
+    try:
+        _serpapi_get_json(params)
+    except Exception as e:
+        print(f"Prefetch {params.get('engine')} failed: {e}")
+    finally:
+        _prefetch_context.active = False
+        _prefetch_pending.release()
+
+
+def _prefetch(params: dict) -> None:
+    if _tool_cache_has(params):
+        return
+    # Prefetching is best effort: when the pool is busy the lookup is dropped, not queued
+    if not _prefetch_pending.acquire(blocking=False):
+        with _tool_cache_lock:
+            _prefetch_metrics["skipped"] += 1
+        return
+    print(f"Prefetching {_tool_cache_key(params)}")
+    _prefetch_pool.submit(_run_prefetch, params)
+
+
+def _city_from_hotel_query(query: str) -> str:
+    match = re.search(r"\bin\s+(.+)$", query.strip(), re.IGNORECASE)
+    return (match.group(1) if match else query).strip()
+
+
+def prefetch_follow_up(tool, args: dict, tool_context, tool_response: dict):
+    """after_tool_callback: remembers the trip seen so far in the session and prefetches the likely next lookup."""
+    trip = dict(tool_context.state.get("trip") or {})
+    user_text = " ".join(part.text for part in (tool_context.user_content.parts if tool_context.user_content else []) if part.text)
+    dates = _DATE_PATTERN.findall(user_text)
+    if len(dates) >= 2:
+        trip["check_in"], trip["check_out"] = dates[0], dates[1]
+    elif dates:
+        check_in = datetime.date.fromisoformat(dates[0])
+        trip["check_in"], trip["check_out"] = dates[0], (check_in + datetime.timedelta(days=_PREFETCH_STAY_NIGHTS)).isoformat()
+
+    if tool.name in _ROUTE_TOOLS:
+        trip["origin"], trip["destination"] = args["start_addr"], args["dest_addr"]
+        if trip.get("check_in") and trip.get("check_out"):
+            _prefetch(_hotel_search_params(f"Hotels in {trip['destination']}", trip["check_in"], trip["check_out"]))
+    elif tool.name in _HOTEL_TOOLS:
+        trip["destination"] = args.get("city") or _city_from_hotel_query(args["query"])
+        trip["check_in"], trip["check_out"] = args["start_date"], args["end_date"]
+        origin = _ORIGIN_PATTERN.search(user_text)
+        if origin:
+            trip["origin"] = origin.group(1).strip()
+        if trip.get("origin"):
+            # The way there is already cached when the route was asked first, then only the return leg is fetched
+            _prefetch(_directions_params(trip["origin"], trip["destination"]))
+            _prefetch(_directions_params(trip["destination"], trip["origin"]))
+
+    tool_context.state["trip"] = trip
+    return None
+
+
+def prefetch_metrics() -> dict:
+    """Prefetch hit rate and wasted calls (prefetched results evicted or expired without being used)."""
+    with _tool_cache_lock:
+        # Expired entries are otherwise only dropped when looked up again, so unused prefetches would go uncounted
+        now = time.monotonic()
+        for key in [key for key, entry in _tool_cache.items() if entry["expires_at"] < now and entry["future"].done()]:
+            _drop_cache_entry(key)
+        metrics = dict(_prefetch_metrics)
+    metrics["hit_rate"] = round(metrics["hits"] / metrics["issued"], 3) if metrics["issued"] else None
+    return metrics
+
+# ----- END: SPECULATIVE PREFETCH -----
+
+# ----- START: ARTIFACT OFFLOAD -----
+
+# Bulky tool results (a 20 hotel report, a full directions list) would otherwise stay
+# in the conversation on every later turn. Above the threshold they are saved as a
+# session artifact and the model gets a short digest plus a handle to expand on demand.
+_ARTIFACT_OFFLOAD_THRESHOLD_CHARS = int(os.getenv("ARTIFACT_OFFLOAD_THRESHOLD_CHARS", "4000"))  # 0 disables offloading
+_DIGEST_ITEMS = 5
+_DIGEST_FIELDS = (
+    "Name", "Link", "Check-In", "Check-Out", "HotelClass", "StartingRatePerNight", "UserRatings", "AverageDistanceKm",
+    "TravelMode", "Mode", "Airlines", "DurationMinutes", "DistanceKm", "PriceINR",
+)
+
+
+def _digest(value):
+    if isinstance(value, list):
+        return {"total_items": len(value), "top_items": [_digest(item) for item in value[:_DIGEST_ITEMS]]}
+    if isinstance(value, dict):
+        if any(field in value for field in _DIGEST_FIELDS):
+            return {field: value[field] for field in _DIGEST_FIELDS if field in value}
+        return {key: _digest(item) for key, item in value.items()}
+    return value
+
+
+async def offload_large_tool_result(tool, args: dict, tool_context: ToolContext, tool_response: dict):
+    """after_tool_callback: replaces a large tool result with a digest and the handle of the artifact holding it."""
+    if not _ARTIFACT_OFFLOAD_THRESHOLD_CHARS or tool.name == "expand_tool_result" or not isinstance(tool_response, dict):
+        return None
+    payload = json.dumps(tool_response, ensure_ascii=False)
+    if len(payload) <= _ARTIFACT_OFFLOAD_THRESHOLD_CHARS:
+        return None
+
+    handle = f"{tool.name}-{tool_context.function_call_id}.json"
+    try:
+        await tool_context.save_artifact(handle, types.Part.from_bytes(data=payload.encode(), mime_type="application/json"))
+    except ValueError:  # No artifact service configured for this runner, keep the result inline
+        return None
+    print(f"Offloaded {len(payload)} chars of {tool.name} result to artifact {handle}")
+    return {
+        "status": tool_response.get("status"),
+        "artifact_handle": handle,
+        "digest": _digest(tool_response.get("report")),
+        "note": "Only a digest is shown. Call expand_tool_result with artifact_handle to read the full result.",
+    }
+
+
+async def expand_tool_result(artifact_handle: str, tool_context: ToolContext, offset: int = 0, limit: int = 10) -> dict:
+    """Returns the full data of a tool result that was stored as an artifact, a page of items at a time.
+    Use this when the digest of a tool result does not have the details needed (booking links, check-in times, route descriptions, etc.)
+
+    Args:
+        artifact_handle (str): The artifact_handle returned with the digest
+        offset (int): Index of the first item to return
+        limit (int): Maximum number of items to return
+
+    Returns:
+        dict: status and the requested items of the stored tool result
+    """
+
+    artifact = await tool_context.load_artifact(artifact_handle)
+    if artifact is None:
+        return {"status": "error", "error_message": f"Result {artifact_handle} is no longer stored, please run the search again."}
+
+    result = json.loads(artifact.inline_data.data)
+    report = result.get("report")
+    if isinstance(report, dict):
+        # e.g. compare_transport_modes: its Options table (and any other list) is paged, single rows are kept
+        return {
+            "status": result.get("status"),
+            "total_items": {key: len(value) for key, value in report.items() if isinstance(value, list)},
+            "offset": offset,
+            "report": {key: value[offset:offset + limit] if isinstance(value, list) else value for key, value in report.items()},
+        }
+    if not isinstance(report, list):
+        return result
+    return {
+        "status": result.get("status"),
+        "total_items": len(report),
+        "offset": offset,
+        "report": report[offset:offset + limit],
+    }
+
+
+# ----- END: ARTIFACT OFFLOAD -----
+
+# ----- START: TOOL TIMINGS -----
+
+# With TOOL_TIMINGS_PATH set, the wall time of every tool call is measured around the
+# tool itself and appended to that file as a JSON line, along with the prefetch metrics
+# so far. The load test reads it back, since the event timestamps returned by /run also
+# include the LLM call before the tool.
+_TOOL_TIMINGS_PATH = os.getenv("TOOL_TIMINGS_PATH")
+_tool_timings_lock = threading.Lock()
+_tool_started = {}  # function_call_id -> perf_counter at the start of the tool
+
+
+def start_tool_timer(tool, args: dict, tool_context: ToolContext):
+    """before_tool_callback: notes when the tool call started."""
+    if _TOOL_TIMINGS_PATH:
+        _tool_started[tool_context.function_call_id] = time.perf_counter()
+    return None
+
+
+def record_tool_time(tool, args: dict, tool_context: ToolContext, tool_response: dict):
+    """after_tool_callback: appends how long the tool call took to TOOL_TIMINGS_PATH."""
+    started = _tool_started.pop(tool_context.function_call_id, None)
+    if started is None:
+        return None
+    line = json.dumps({
+        "ts": time.time(),
+        "tool": tool.name,
+        "ms": round((time.perf_counter() - started) * 1000, 2),
+        "prefetch": prefetch_metrics(),
+    })
+    with _tool_timings_lock, open(_TOOL_TIMINGS_PATH, "a") as timings:
+        timings.write(line + "\n")
+    return None
+
+
+# ----- END: TOOL TIMINGS -----
+
 # ----- START: HOTEL SEARCH AGENT -----
 
 def get_current_date() -> dict:
@@ -34,6 +461,23 @@ def get_current_date() -> dict:
     return {"status": "success", "report": report}
 
 
+def _hotel_search_params(query: str, start_date: str, end_date: str) -> dict:
+    return {
+        "api_key": serp_api_key,
+        "engine": "google_hotels",  # Specify the search engine (e.g., google, google_maps, youtube)
+        "q": query,  # The search query
+        "check_in_date": start_date, # Required
+        "check_out_date": end_date, # Required
+        # "adults": "",
+        # "children": "",
+
+        "location": "India",  # Optional: Geolocation for localized results
+        "hl": "en",  # Optional: Host language
+        "gl": "in",  # Optional: Geolocation for country-specific results
+        "currency": "INR" # Optional: Defaults to USD,
+    }
+
+
 def search_hotels(query: str, start_date: str, end_date: str) -> list:
     """Returns list of Hotels availablile for a range of specified days in a city for booking.
     Returns minimum rate per night, places that are nearer to the hotel, Review ratings of the hotels, class of the hotel like 2 or 3 or 4 or 5 stars, check-in and check-out time policy, etc.
@@ -48,28 +492,12 @@ def search_hotels(query: str, start_date: str, end_date: str) -> list:
     """
 
     # Define the search parameters
-    params = {
-        "api_key": serp_api_key,
-        "engine": "google_hotels",  # Specify the search engine (e.g., google, google_maps, youtube)
-        "q": query,  # The search query
-        "check_in_date": start_date, # Required
-        "check_out_date": end_date, # Required
-        # "adults": "",
-        # "children": "",
-
-        "location": "India",  # Optional: Geolocation for localized results
-        "hl": "en",  # Optional: Host language
-        "gl": "in",  # Optional: Geolocation for country-specific results
-        "currency": "INR" # Optional: Defaults to USD,
-    }
+    params = _hotel_search_params(query, start_date, end_date)
 
     print(params)
 
-    # Create a GoogleSearch object
-    search = GoogleSearch(params)
-
     # Get the results as a JSON object
-    hotels = search.get_json()
+    hotels = _serpapi_get_json(params)
     results = []
 
     # Process and print the organic results
@@ -91,14 +519,214 @@ def search_hotels(query: str, start_date: str, end_date: str) -> list:
                 "HotelClass": hotel.get('hotel_class'),
                 "StartingRatePerNight": hotel.get('rate_per_night').get('lowest'),
                 "UserRatings": hotel.get('overall_rating'),
-                "NearbyPlaces": hotel.get('nearby_places')
+                "NearbyPlaces": hotel.get('nearby_places'),
+                "GpsCoordinates": hotel.get('gps_coordinates')
                 })
+        _index_hotels(query, start_date, end_date, results)
     else:
         results.append("No Hotel Properties found.")
 
     return {"status": "success", "report": results}
 
 
+# Hotels returned by search_hotels are kept per city query and bucketed by geohash,
+# so ranking against the user's places of interest is a numeric lookup instead of
+# the LLM reading NearbyPlaces text. Entries expire with the tool cache, so prices
+# are never older than the SerpApi response they came from.
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GEOHASH_PRECISION = 6  # ~1.2km x 0.6km cells
+_EARTH_RADIUS_KM = 6371.0088
+
+_INDEX_TTL_SECONDS = _TOOL_CACHE_TTL_SECONDS
+_INDEX_MAX_ENTRIES = _TOOL_CACHE_MAX_ENTRIES
+
+_hotel_index = OrderedDict()  # (query, start_date, end_date) -> (expires_at, {geohash: [hotel, ...]})
+_hotel_index_lock = threading.Lock()
+
+
+def _geohash(lat: float, lng: float, precision: int = _GEOHASH_PRECISION) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def _geohash_cell_size(precision: int) -> tuple:
+    """Returns the (height, width) in degrees of a geohash cell of the given length."""
+    lng_bits = (5 * precision + 1) // 2
+    return 180.0 / 2 ** (5 * precision - lng_bits), 360.0 / 2 ** lng_bits
+
+
+def _geohash_block(lat: float, lng: float, precision: int) -> set:
+    """Returns the geohash cell around (lat, lng) and its 8 neighbours."""
+    height, width = _geohash_cell_size(precision)
+    cells = set()
+    for d_lat in (-height, 0.0, height):
+        for d_lng in (-width, 0.0, width):
+            if -90.0 <= lat + d_lat < 90.0:
+                cells.add(_geohash(lat + d_lat, (lng + d_lng + 180.0) % 360.0 - 180.0, precision))
+    return cells
+
+
+def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _hotel_distance_km(hotel: dict, lat: float, lng: float) -> float:
+    gps = hotel["GpsCoordinates"]
+    return _haversine_km(lat, lng, gps["latitude"], gps["longitude"])
+
+
+def _hotel_key(query: str, start_date: str, end_date: str) -> tuple:
+    return (query.strip().lower(), start_date, end_date)
+
+
+def _index_hotels(query: str, start_date: str, end_date: str, hotels: list) -> None:
+    buckets = {}
+    for hotel in hotels:
+        gps = hotel.get("GpsCoordinates") or {}
+        if gps.get("latitude") is None or gps.get("longitude") is None:
+            continue
+        buckets.setdefault(_geohash(gps["latitude"], gps["longitude"]), []).append(hotel)
+    _ttl_put(_hotel_index, _hotel_key(query, start_date, end_date), buckets)
+
+
+def _ttl_put(cache: OrderedDict, key, value) -> None:
+    with _hotel_index_lock:
+        cache[key] = (time.monotonic() + _INDEX_TTL_SECONDS, value)
+        cache.move_to_end(key)
+        while len(cache) > _INDEX_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+
+def _ttl_get(cache: OrderedDict, key):
+    """Returns the cached value, or None when it was never stored or has expired."""
+    with _hotel_index_lock:
+        entry = cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            cache.pop(key, None)
+            return None
+        cache.move_to_end(key)
+        return entry[1]
+
+
+def _nearby_hotels(buckets: dict, lat: float, lng: float, min_count: int) -> list:
+    """Returns a subset of the indexed hotels that is guaranteed to hold the min_count hotels nearest to (lat, lng).
+
+    Walks up the geohash prefix, looking at the cell around (lat, lng) plus its 8 neighbours.
+    Any hotel outside that 3x3 block is at least one cell side away, so the block is enough
+    once its min_count-th nearest hotel is closer than that.
+    """
+    hotels = [hotel for bucket in buckets.values() for hotel in bucket]
+    for length in range(_GEOHASH_PRECISION, 0, -1):
+        cells = _geohash_block(lat, lng, length)
+        found = [hotel for gh, bucket in buckets.items() if gh[:length] in cells for hotel in bucket]
+        if len(found) < min_count:
+            continue
+        height, width = _geohash_cell_size(length)
+        side_km = min(
+            _EARTH_RADIUS_KM * math.radians(height),
+            _EARTH_RADIUS_KM * math.asin(math.cos(math.radians(lat)) * math.sin(math.radians(width))),
+        )
+        if sorted(_hotel_distance_km(hotel, lat, lng) for hotel in found)[min_count - 1] <= side_km:
+            return found
+    return hotels
+
+
+def _geocode_place(place: str, city: str):
+    # Lookups go through the shared tool cache, so coordinates expire with it and failed lookups are retried
+    params = {
+        "api_key": serp_api_key,
+        "engine": "google_maps",
+        "type": "search",
+        "q": f"{place}, {city}",
+        "hl": "en",
+        "gl": "in",
+    }
+    print(params)
+
+    places = _serpapi_get_json(params)
+    gps = (places.get("place_results") or {}).get("gps_coordinates")
+    if not gps and places.get("local_results"):
+        gps = places["local_results"][0].get("gps_coordinates")
+    return (gps["latitude"], gps["longitude"]) if gps else None
+
+
+def rank_hotels_by_proximity(query: str, city: str, start_date: str, end_date: str, places_of_interest: list[str], top_n: int = 5) -> dict:
+    """Returns hotels in a city ranked by distance (in km) to the places the user wants to visit.
+    Use this instead of search_hotels when the user has mentioned specific places, landmarks or areas they want to stay near.
+
+    Args:
+        query (str): The hotel search query, same as for search_hotels (e.g. "Hotels in Jaipur")
+        city (str): The name of the city the places of interest are located in
+        start_date (str): Hotel check-in date in YYYY-MM-DD format
+        end_date (str): Hotel check-out date in YYYY-MM-DD format
+        places_of_interest (list[str]): Names of places the user wants to visit (e.g. ["Hawa Mahal", "Amer Fort"])
+        top_n (int): Number of nearest hotels to return
+
+    Returns:
+        dict: status and a list of hotels sorted by average distance to the places of interest, nearest first
+    """
+
+    key = _hotel_key(query, start_date, end_date)
+    buckets = _ttl_get(_hotel_index, key)
+    if buckets is None:
+        search_hotels(query, start_date, end_date)
+        buckets = _ttl_get(_hotel_index, key)
+    if not buckets:
+        return {"status": "error", "error_message": f"No hotels with location details found for '{query}'."}
+
+    places = {}
+    for place in places_of_interest:
+        coordinates = _geocode_place(place, city)
+        if coordinates:
+            places[place] = coordinates
+    if not places:
+        return {"status": "error", "error_message": "Could not find the location of any of the places of interest."}
+
+    # With a single place only the hotels in the geohash cells around it are scored. The average
+    # distance to several places cannot be pruned cell by cell, so then every indexed hotel is scored.
+    if len(places) == 1:
+        [(lat, lng)] = places.values()
+        candidates = _nearby_hotels(buckets, lat, lng, top_n)
+    else:
+        candidates = [hotel for bucket in buckets.values() for hotel in bucket]
+
+    ranked = []
+    for hotel in candidates:
+        distances = {
+            place: round(_hotel_distance_km(hotel, lat, lng), 2)
+            for place, (lat, lng) in places.items()
+        }
+        ranked.append({
+            **hotel,
+            "DistanceToPlacesKm": distances,
+            "AverageDistanceKm": round(sum(distances.values()) / len(distances), 2),
+        })
+    ranked.sort(key=lambda hotel: hotel["AverageDistanceKm"])
+
+    return {
+        "status": "success",
+        "places_not_found": [place for place in places_of_interest if place not in places],
+        "report": ranked[:top_n],
+    }
+
+
 # Date Tool
 # Calendar Tool - to find holidays
 
@@ -114,31 +742,23 @@ hotel_booking_agent = Agent(
         Role: You are a Indian Hotel Booking Agent.
         - You take any hotel accomodation request and suggest only the top 3 best hotels to stay in that city.
         - Hotels should be located within the touris city mentioned by the user.
-        - If the user has mentioned any preference to visit any specific places in the city, then give preference to hotels that are nearer to those places.
+        - If the user has mentioned any preference to visit any specific places in the city, then use rank_hotels_by_proximity to get hotels ranked by distance to those places and give preference to the nearest ones.
         - Summarise the Hotel recommendation in a markdown structure, includ check-in and check-out timings, user ratings and hotel booking link
         - Share only the hotels which has web links available for booking
         - If the user does not provide specific details, make reasonable assumptions and provide hotels suggestions with more than 4 star class Hotels
+        - Large tool results come back as a digest with an artifact_handle; call expand_tool_result only when you need details that are not in the digest
     """,
-    tools=[get_current_date, search_hotels]
+    tools=[get_current_date, search_hotels, rank_hotels_by_proximity, expand_tool_result],
+    before_tool_callback=start_tool_timer,
+    after_tool_callback=[record_tool_time, prefetch_follow_up, offload_large_tool_result],
 )
 
 # ----- END: HOTEL SEARCH AGENT -----
 
 # ----- START: ROUTE DESTINATION SUGGEST AGENT -----
 
-def search_map_directions(start_addr: str, dest_addr: str) -> list:
-    """Returns list of best routes available between start and destination address for different mode of transport
-    
-    Args:
-        start_addr (str): Start Address of travel
-        dest_addr (str): Destination Address
-
-    Returns:
-        list: List of dictionary. Each item in this list is a dict containing the hotel available information for the specified dates
-    """
-
-    # Define the search parameters
-    params = {
+def _directions_params(start_addr: str, dest_addr: str) -> dict:
+    return {
         "api_key": serp_api_key,
         "engine": "google_maps_directions",
         "start_addr": start_addr,
@@ -146,15 +766,33 @@ def search_map_directions(start_addr: str, dest_addr: str) -> list:
         "gl": "in",
         "travel_mode": 4
     }
+
+
+def _fetch_directions(start_addr: str, dest_addr: str) -> dict:
+    # Define the search parameters
+    params = _directions_params(start_addr, dest_addr)
     
     print(params)
 
-    # Create a GoogleSearch object
-    search = GoogleSearch(params)
-    directions = search.get_json()
-    results = []
+    directions = _serpapi_get_json(params)
     
     print(directions)
+    return directions
+
+
+def search_map_directions(start_addr: str, dest_addr: str) -> list:
+    """Returns list of best routes available between start and destination address for different mode of transport
+    
+    Args:
+        start_addr (str): Start Address of travel
+        dest_addr (str): Destination Address
+
+    Returns:
+        list: List of dictionary. Each item in this list is a dict containing the hotel available information for the specified dates
+    """
+
+    directions = _fetch_directions(start_addr, dest_addr)
+    results = []
 
     if "directions" in directions:
         print("Source to Destination Directions:")
@@ -171,7 +809,8 @@ def search_map_directions(start_addr: str, dest_addr: str) -> list:
                     "TravelMode": direction.get('travel_mode'),
                     "Distance": direction.get('formatted_distance'),
                     "Duration": direction.get('formatted_duration'),
-                    "RouteDescription": direction.get('extensions')
+                    "RouteDescription": direction.get('extensions'),
+                    **_route_metrics(direction)
                     })
     else:
         results.append("No Directions found.")
@@ -190,24 +829,8 @@ def search_directions_via_flight(start_addr: str, dest_addr: str) -> list:
         list: List of dictionary. Each item in this list is a dict containing the Flight details and flight ticket price
     """
 
-    # Define the search parameters
-    params = {
-        "api_key": serp_api_key,
-        "engine": "google_maps_directions",
-        "start_addr": start_addr,
-        "end_addr": dest_addr,  
-        "gl": "in",
-        "travel_mode": 4
-    }
-    
-    print(params)
-
-    # Create a GoogleSearch object
-    search = GoogleSearch(params)
-    directions = search.get_json()
+    directions = _fetch_directions(start_addr, dest_addr)
     results = []
-    
-    print(directions)
 
     if "directions" in directions:
         print("Source to Destination Directions:")
@@ -231,6 +854,7 @@ def search_directions_via_flight(start_addr: str, dest_addr: str) -> list:
                 "RoundTripPrice": direction.get('flight').get('round_trip_price'),
                 "TravelDuration": direction.get('flight').get('formatted_nonstop_duration'),
                 "FlightLink": direction.get('flight').get('google_flights_link'),
+                **_flight_metrics(direction)
                 })
     else:
         results.append("No Directions found.")
@@ -238,6 +862,136 @@ def search_directions_via_flight(start_addr: str, dest_addr: str) -> list:
     return {"status": "success", "report": results}
 
 
+# Directions come back with display strings ("5 hr 20 min", "1,420 km", "₹4,520").
+# They are normalised to minutes, km and INR so the agent can compare modes numerically.
+# PriceINR is always one way: flights only carry a round-trip fare, so half of it is used.
+_DURATION_UNITS_MINUTES = {"day": 1440, "d": 1440, "hour": 60, "hr": 60, "h": 60, "minute": 1, "min": 1, "m": 1}
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(days?|d|hours?|hrs?|h|minutes?|mins?|m)\b", re.IGNORECASE)
+_DISTANCE_PATTERN = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(km|m)\b", re.IGNORECASE)
+_PRICE_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def _parse_duration_minutes(text) -> float | None:
+    if not text:
+        return None
+    minutes = 0.0
+    for value, unit in _DURATION_PATTERN.findall(str(text)):
+        unit = unit.lower()
+        unit = unit if unit in _DURATION_UNITS_MINUTES else unit.rstrip("s")
+        minutes += float(value) * _DURATION_UNITS_MINUTES[unit]
+    return round(minutes, 1) if minutes else None
+
+
+def _parse_distance_km(text) -> float | None:
+    match = _DISTANCE_PATTERN.search(str(text or ""))
+    if not match:
+        return None
+    value = float(match.group(1).replace(",", ""))
+    return round(value if match.group(2).lower() == "km" else value / 1000, 2)
+
+
+def _parse_price_inr(value, currency=None) -> float | None:
+    if value is None or (currency and currency != "INR"):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    # Only the number is kept, so the dot in a "Rs. 4,520" prefix is not read as a decimal point
+    match = _PRICE_PATTERN.search(str(value))
+    return float(match.group().replace(",", "")) if match else None
+
+
+def _transit_mode(direction: dict) -> str:
+    """Transit routes are labelled by their main vehicle (Train or Bus) so they compare against Driving and Flight."""
+    mode = direction.get('travel_mode')
+    if mode != 'Transit':
+        return mode
+    vehicles = [trip.get('travel_mode', '') for trip in direction.get('trips') or []]
+    if any('train' in vehicle.lower() or 'rail' in vehicle.lower() for vehicle in vehicles):
+        return 'Train'
+    if any('bus' in vehicle.lower() for vehicle in vehicles):
+        return 'Bus'
+    return mode
+
+
+def _route_metrics(direction: dict) -> dict:
+    duration = direction.get('duration')
+    distance = direction.get('distance')
+    return {
+        "DurationMinutes": round(duration / 60, 1) if isinstance(duration, (int, float)) else _parse_duration_minutes(direction.get('formatted_duration')),
+        "DistanceKm": round(distance / 1000, 2) if isinstance(distance, (int, float)) else _parse_distance_km(direction.get('formatted_distance')),
+        "PriceINR": _parse_price_inr(direction.get('cost'), direction.get('currency')),
+    }
+
+
+def _flight_metrics(direction: dict) -> dict:
+    flight = direction.get('flight') or {}
+    duration = flight.get('nonstop_duration')  # seconds, like the duration of the other modes
+    round_trip = _parse_price_inr(flight.get('round_trip_price'), flight.get('currency'))
+    return {
+        "DurationMinutes": round(duration / 60, 1) if isinstance(duration, (int, float)) else _parse_duration_minutes(flight.get('formatted_nonstop_duration')),
+        "DistanceKm": _route_metrics(direction)["DistanceKm"],
+        "PriceINR": round(round_trip / 2, 2) if round_trip is not None else None,
+        "RoundTripPriceINR": round_trip,
+    }
+
+
+def _pareto_front(rows: list) -> list:
+    """Options for which no other option is both at least as fast and at least as cheap."""
+    priced = [row for row in rows if row["DurationMinutes"] is not None and row["PriceINR"] is not None]
+    return [
+        row for row in priced
+        if not any(
+            other["DurationMinutes"] <= row["DurationMinutes"] and other["PriceINR"] <= row["PriceINR"]
+            and (other["DurationMinutes"], other["PriceINR"]) != (row["DurationMinutes"], row["PriceINR"])
+            for other in priced
+        )
+    ]
+
+
+def compare_transport_modes(start_addr: str, dest_addr: str) -> dict:
+    """Returns one comparison table of all transport modes (Train, Bus, Driving, Flight) between start and destination address,
+    sorted by travel time, with the fastest option, the cheapest option and the options that are the best trade-off between time and price.
+
+    Args:
+        start_addr (str): Start Address of travel
+        dest_addr (str): Destination Address
+
+    Returns:
+        dict: status and the comparison table with duration in minutes, distance in km and one-way price in INR for each option
+    """
+
+    directions = _fetch_directions(start_addr, dest_addr)
+    if "directions" not in directions:
+        return {"status": "error", "error_message": "No Directions found."}
+
+    rows = []
+    for direction in directions["directions"]:
+        if direction.get('travel_mode') == 'Flight':
+            flight = direction.get('flight') or {}
+            metrics = _flight_metrics(direction)
+            details = f"{flight.get('airlines')} {flight.get('departure')} - {flight.get('arrival')}"
+            link = flight.get('google_flights_link')
+        else:
+            metrics = _route_metrics(direction)
+            details = direction.get('via') or direction.get('extensions')
+            link = None
+        rows.append({"Mode": _transit_mode(direction), **metrics, "Details": details, "Link": link})
+
+    rows.sort(key=lambda row: (row["DurationMinutes"] is None, row["DurationMinutes"] or 0))
+    timed = [row for row in rows if row["DurationMinutes"] is not None]
+    priced = [row for row in rows if row["PriceINR"] is not None]
+
+    return {
+        "status": "success",
+        "report": {
+            "Options": rows,
+            "Fastest": timed[0] if timed else None,
+            "Cheapest": min(priced, key=lambda row: row["PriceINR"]) if priced else None,
+            "ParetoFront": _pareto_front(rows),
+        },
+    }
+
+
 # Date Tool
 # Calendar Tool - to find holidays
 
@@ -254,9 +1008,13 @@ route_finder_agent = Agent(
     - For a source and destination city you will suggest all modes of transportation available and how much time will it take to cover the distance.
     - Be very professional and polite while asking any follow-up queries with users if required
     - If the user does not provide specific transport preferences, make reasonable assumptions and provide fastest transport mode available
+    - Use compare_transport_modes to compare travel time and price across modes; it already gives the fastest, cheapest and best trade-off options
     - Display all available directions formatted and share it user 
+    - Large tool results come back as a digest with an artifact_handle; call expand_tool_result only when you need details that are not in the digest
     """,
-    tools=[get_current_date, search_map_directions, search_directions_via_flight]
+    tools=[get_current_date, search_map_directions, search_directions_via_flight, compare_transport_modes, expand_tool_result],
+    before_tool_callback=start_tool_timer,
+    after_tool_callback=[record_tool_time, prefetch_follow_up, offload_large_tool_result],
 )
 
 
@@ -283,12 +1041,15 @@ root_agent = Agent(
     sub_agents = [
         route_finder_agent, hotel_booking_agent
     ],
+    before_tool_callback=start_tool_timer,
+    after_tool_callback=record_tool_time,
 )
 
 
 print(f"Agent '{root_agent.name}'.")
 
 session_service = InMemorySessionService() 
+artifact_service = InMemoryArtifactService()  # adk api_server uses --artifact_service_uri instead (see agents/services.py)
 
 # Without this Agent it wasnt responding ????????
 
@@ -296,7 +1057,8 @@ session_service = InMemorySessionService()
 runner = Runner(
     agent=root_agent, # The agent we want to run
     app_name="Help Desk Agent",   # Associates runs with our app
-    session_service=session_service # Uses our session manager
+    session_service=session_service, # Uses our session manager
+    artifact_service=artifact_service
 )
 
 # app = FastAPI()
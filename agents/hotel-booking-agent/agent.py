@@ -1,5 +1,9 @@
 import os
+import math
+import time
 import datetime
+import threading
+from collections import OrderedDict
 from zoneinfo import ZoneInfo
 from google.adk.agents import Agent
 from google.adk.runners import Runner
@@ -88,14 +92,223 @@ def search_hotels(query: str, start_date: str, end_date: str) -> list:
                 "HotelClass": hotel.get('hotel_class'),
                 "StartingRatePerNight": hotel.get('rate_per_night').get('lowest'),
                 "UserRatings": hotel.get('overall_rating'),
-                "NearbyPlaces": hotel.get('nearby_places')
+                "NearbyPlaces": hotel.get('nearby_places'),
+                "GpsCoordinates": hotel.get('gps_coordinates')
                 })
+        _index_hotels(query, start_date, end_date, results)
     else:
         results.append("No Hotel Properties found.")
 
     return {"status": "success", "report": results}
 
 
+# Hotels returned by search_hotels are kept per city query and bucketed by geohash,
+# so ranking against the user's places of interest is a numeric lookup instead of
+# the LLM reading NearbyPlaces text. Entries expire after a while, so rankings are
+# not served from stale prices.
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GEOHASH_PRECISION = 6  # ~1.2km x 0.6km cells
+_EARTH_RADIUS_KM = 6371.0088
+
+_INDEX_TTL_SECONDS = int(os.getenv("TOOL_CACHE_TTL_SECONDS", "900"))
+_INDEX_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "512"))
+
+_hotel_index = OrderedDict()  # (query, start_date, end_date) -> (expires_at, {geohash: [hotel, ...]})
+_poi_coordinates = OrderedDict()  # (place, city) -> (expires_at, (lat, lng))
+_hotel_index_lock = threading.Lock()
+
+
+def _geohash(lat: float, lng: float, precision: int = _GEOHASH_PRECISION) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def _geohash_cell_size(precision: int) -> tuple:
+    """Returns the (height, width) in degrees of a geohash cell of the given length."""
+    lng_bits = (5 * precision + 1) // 2
+    return 180.0 / 2 ** (5 * precision - lng_bits), 360.0 / 2 ** lng_bits
+
+
+def _geohash_block(lat: float, lng: float, precision: int) -> set:
+    """Returns the geohash cell around (lat, lng) and its 8 neighbours."""
+    height, width = _geohash_cell_size(precision)
+    cells = set()
+    for d_lat in (-height, 0.0, height):
+        for d_lng in (-width, 0.0, width):
+            if -90.0 <= lat + d_lat < 90.0:
+                cells.add(_geohash(lat + d_lat, (lng + d_lng + 180.0) % 360.0 - 180.0, precision))
+    return cells
+
+
+def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _hotel_distance_km(hotel: dict, lat: float, lng: float) -> float:
+    gps = hotel["GpsCoordinates"]
+    return _haversine_km(lat, lng, gps["latitude"], gps["longitude"])
+
+
+def _hotel_key(query: str, start_date: str, end_date: str) -> tuple:
+    return (query.strip().lower(), start_date, end_date)
+
+
+def _index_hotels(query: str, start_date: str, end_date: str, hotels: list) -> None:
+    buckets = {}
+    for hotel in hotels:
+        gps = hotel.get("GpsCoordinates") or {}
+        if gps.get("latitude") is None or gps.get("longitude") is None:
+            continue
+        buckets.setdefault(_geohash(gps["latitude"], gps["longitude"]), []).append(hotel)
+    _ttl_put(_hotel_index, _hotel_key(query, start_date, end_date), buckets)
+
+
+def _ttl_put(cache: OrderedDict, key, value) -> None:
+    with _hotel_index_lock:
+        cache[key] = (time.monotonic() + _INDEX_TTL_SECONDS, value)
+        cache.move_to_end(key)
+        while len(cache) > _INDEX_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+
+def _ttl_get(cache: OrderedDict, key):
+    """Returns the cached value, or None when it was never stored or has expired."""
+    with _hotel_index_lock:
+        entry = cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            cache.pop(key, None)
+            return None
+        cache.move_to_end(key)
+        return entry[1]
+
+
+def _nearby_hotels(buckets: dict, lat: float, lng: float, min_count: int) -> list:
+    """Returns a subset of the indexed hotels that is guaranteed to hold the min_count hotels nearest to (lat, lng).
+
+    Walks up the geohash prefix, looking at the cell around (lat, lng) plus its 8 neighbours.
+    Any hotel outside that 3x3 block is at least one cell side away, so the block is enough
+    once its min_count-th nearest hotel is closer than that.
+    """
+    hotels = [hotel for bucket in buckets.values() for hotel in bucket]
+    for length in range(_GEOHASH_PRECISION, 0, -1):
+        cells = _geohash_block(lat, lng, length)
+        found = [hotel for gh, bucket in buckets.items() if gh[:length] in cells for hotel in bucket]
+        if len(found) < min_count:
+            continue
+        height, width = _geohash_cell_size(length)
+        side_km = min(
+            _EARTH_RADIUS_KM * math.radians(height),
+            _EARTH_RADIUS_KM * math.asin(math.cos(math.radians(lat)) * math.sin(math.radians(width))),
+        )
+        if sorted(_hotel_distance_km(hotel, lat, lng) for hotel in found)[min_count - 1] <= side_km:
+            return found
+    return hotels
+
+
+def _geocode_place(place: str, city: str):
+    key = (place.strip().lower(), city.strip().lower())
+    coordinates = _ttl_get(_poi_coordinates, key)
+    if coordinates:
+        return coordinates
+
+    params = {
+        "api_key": serp_api_key,
+        "engine": "google_maps",
+        "type": "search",
+        "q": f"{place}, {city}",
+        "hl": "en",
+        "gl": "in",
+    }
+    print(params)
+
+    places = GoogleSearch(params).get_json()
+    gps = (places.get("place_results") or {}).get("gps_coordinates")
+    if not gps and places.get("local_results"):
+        gps = places["local_results"][0].get("gps_coordinates")
+    if not gps:
+        return None  # Not cached, so a failed lookup is retried next time
+    coordinates = (gps["latitude"], gps["longitude"])
+    _ttl_put(_poi_coordinates, key, coordinates)
+    return coordinates
+
+
+def rank_hotels_by_proximity(query: str, city: str, start_date: str, end_date: str, places_of_interest: list[str], top_n: int = 5) -> dict:
+    """Returns hotels in a city ranked by distance (in km) to the places the user wants to visit.
+    Use this instead of search_hotels when the user has mentioned specific places, landmarks or areas they want to stay near.
+
+    Args:
+        query (str): The hotel search query, same as for search_hotels (e.g. "Hotels in Jaipur")
+        city (str): The name of the city the places of interest are located in
+        start_date (str): Hotel check-in date in YYYY-MM-DD format
+        end_date (str): Hotel check-out date in YYYY-MM-DD format
+        places_of_interest (list[str]): Names of places the user wants to visit (e.g. ["Hawa Mahal", "Amer Fort"])
+        top_n (int): Number of nearest hotels to return
+
+    Returns:
+        dict: status and a list of hotels sorted by average distance to the places of interest, nearest first
+    """
+
+    key = _hotel_key(query, start_date, end_date)
+    buckets = _ttl_get(_hotel_index, key)
+    if buckets is None:
+        search_hotels(query, start_date, end_date)
+        buckets = _ttl_get(_hotel_index, key)
+    if not buckets:
+        return {"status": "error", "error_message": f"No hotels with location details found for '{query}'."}
+
+    places = {}
+    for place in places_of_interest:
+        coordinates = _geocode_place(place, city)
+        if coordinates:
+            places[place] = coordinates
+    if not places:
+        return {"status": "error", "error_message": "Could not find the location of any of the places of interest."}
+
+    # With a single place only the hotels in the geohash cells around it are scored. The average
+    # distance to several places cannot be pruned cell by cell, so then every indexed hotel is scored.
+    if len(places) == 1:
+        [(lat, lng)] = places.values()
+        candidates = _nearby_hotels(buckets, lat, lng, top_n)
+    else:
+        candidates = [hotel for bucket in buckets.values() for hotel in bucket]
+
+    ranked = []
+    for hotel in candidates:
+        distances = {
+            place: round(_hotel_distance_km(hotel, lat, lng), 2)
+            for place, (lat, lng) in places.items()
+        }
+        ranked.append({
+            **hotel,
+            "DistanceToPlacesKm": distances,
+            "AverageDistanceKm": round(sum(distances.values()) / len(distances), 2),
+        })
+    ranked.sort(key=lambda hotel: hotel["AverageDistanceKm"])
+
+    return {
+        "status": "success",
+        "places_not_found": [place for place in places_of_interest if place not in places],
+        "report": ranked[:top_n],
+    }
+
+
 # Date Tool
 # Calendar Tool - to find holidays
 
@@ -111,12 +324,12 @@ hotel_booking_agent = Agent(
         Role: You are a Indian Hotel Booking Agent.
         - You take any hotel accomodation request and suggest only the top 3 best hotels to stay in that city.
         - Hotels should be located within the touris city mentioned by the user.
-        - If the user has mentioned any preference to visit any specific places in the city, then give preference to hotels that are nearer to those places.
+        - If the user has mentioned any preference to visit any specific places in the city, then use rank_hotels_by_proximity to get hotels ranked by distance to those places and give preference to the nearest ones.
         - Summarise the Hotel recommendation in a markdown structure, includ check-in and check-out timings, user ratings and hotel booking link
         - Share only the hotels which has web links available for booking
         - If the user does not provide specific details, make reasonable assumptions and provide hotels suggestions with more than 4 star class Hotels
     """,
-    tools=[get_current_date, search_hotels, google_search]
+    tools=[get_current_date, search_hotels, rank_hotels_by_proximity, google_search]
 )
 
 print(f"Agent '{hotel_booking_agent.name}'.")
@@ -1,4 +1,6 @@
 import os
+import json
+import re
 import datetime
 from zoneinfo import ZoneInfo
 from google.adk.agents import Agent
@@ -8,7 +10,8 @@ from google.adk.artifacts import InMemoryArtifactService
 
 from google.adk.agents import LlmAgent
 from google.adk.models.lite_llm import LiteLlm
-from google.adk.tools import google_search
+from google.adk.tools import google_search, ToolContext
+from google.genai import types
 from serpapi import GoogleSearch
 
 serp_api_key = os.getenv("SERP_API_KEY")
@@ -32,17 +35,7 @@ def get_current_date() -> dict:
     return {"status": "success", "report": report}
 
 
-def search_map_directions(start_addr: str, dest_addr: str) -> list:
-    """Returns list of best routes available between start and destination address for different mode of transport
-    
-    Args:
-        start_addr (str): Start Address of travel
-        dest_addr (str): Destination Address
-
-    Returns:
-        list: List of dictionary. Each item in this list is a dict containing the hotel available information for the specified dates
-    """
-
+def _fetch_directions(start_addr: str, dest_addr: str) -> dict:
     # Define the search parameters
     params = {
         "api_key": serp_api_key,
@@ -58,9 +51,24 @@ def search_map_directions(start_addr: str, dest_addr: str) -> list:
     # Create a GoogleSearch object
     search = GoogleSearch(params)
     directions = search.get_json()
-    results = []
     
     print(directions)
+    return directions
+
+
+def search_map_directions(start_addr: str, dest_addr: str) -> list:
+    """Returns list of best routes available between start and destination address for different mode of transport
+    
+    Args:
+        start_addr (str): Start Address of travel
+        dest_addr (str): Destination Address
+
+    Returns:
+        list: List of dictionary. Each item in this list is a dict containing the hotel available information for the specified dates
+    """
+
+    directions = _fetch_directions(start_addr, dest_addr)
+    results = []
 
     if "directions" in directions:
         print("Source to Destination Directions:")
@@ -77,7 +85,8 @@ def search_map_directions(start_addr: str, dest_addr: str) -> list:
                     "TravelMode": direction.get('travel_mode'),
                     "Distance": direction.get('formatted_distance'),
                     "Duration": direction.get('formatted_duration'),
-                    "RouteDescription": direction.get('extensions')
+                    "RouteDescription": direction.get('extensions'),
+                    **_route_metrics(direction)
                     })
     else:
         results.append("No Directions found.")
@@ -96,24 +105,8 @@ def search_directions_via_flight(start_addr: str, dest_addr: str) -> list:
         list: List of dictionary. Each item in this list is a dict containing the Flight details and flight ticket price
     """
 
-    # Define the search parameters
-    params = {
-        "api_key": serp_api_key,
-        "engine": "google_maps_directions",
-        "start_addr": start_addr,
-        "end_addr": dest_addr,  
-        "gl": "in",
-        "travel_mode": 4
-    }
-    
-    print(params)
-
-    # Create a GoogleSearch object
-    search = GoogleSearch(params)
-    directions = search.get_json()
+    directions = _fetch_directions(start_addr, dest_addr)
     results = []
-    
-    print(directions)
 
     if "directions" in directions:
         print("Source to Destination Directions:")
@@ -137,6 +130,7 @@ def search_directions_via_flight(start_addr: str, dest_addr: str) -> list:
                 "RoundTripPrice": direction.get('flight').get('round_trip_price'),
                 "TravelDuration": direction.get('flight').get('formatted_nonstop_duration'),
                 "FlightLink": direction.get('flight').get('google_flights_link'),
+                **_flight_metrics(direction)
                 })
     else:
         results.append("No Directions found.")
@@ -144,6 +138,216 @@ def search_directions_via_flight(start_addr: str, dest_addr: str) -> list:
     return {"status": "success", "report": results}
 
 
+# Directions come back with display strings ("5 hr 20 min", "1,420 km", "₹4,520").
+# They are normalised to minutes, km and INR so the agent can compare modes numerically.
+# PriceINR is always one way: flights only carry a round-trip fare, so half of it is used.
+_DURATION_UNITS_MINUTES = {"day": 1440, "d": 1440, "hour": 60, "hr": 60, "h": 60, "minute": 1, "min": 1, "m": 1}
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(days?|d|hours?|hrs?|h|minutes?|mins?|m)\b", re.IGNORECASE)
+_DISTANCE_PATTERN = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(km|m)\b", re.IGNORECASE)
+_PRICE_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def _parse_duration_minutes(text) -> float | None:
+    if not text:
+        return None
+    minutes = 0.0
+    for value, unit in _DURATION_PATTERN.findall(str(text)):
+        unit = unit.lower()
+        unit = unit if unit in _DURATION_UNITS_MINUTES else unit.rstrip("s")
+        minutes += float(value) * _DURATION_UNITS_MINUTES[unit]
+    return round(minutes, 1) if minutes else None
+
+
+def _parse_distance_km(text) -> float | None:
+    match = _DISTANCE_PATTERN.search(str(text or ""))
+    if not match:
+        return None
+    value = float(match.group(1).replace(",", ""))
+    return round(value if match.group(2).lower() == "km" else value / 1000, 2)
+
+
+def _parse_price_inr(value, currency=None) -> float | None:
+    if value is None or (currency and currency != "INR"):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    # Only the number is kept, so the dot in a "Rs. 4,520" prefix is not read as a decimal point
+    match = _PRICE_PATTERN.search(str(value))
+    return float(match.group().replace(",", "")) if match else None
+
+
+def _transit_mode(direction: dict) -> str:
+    """Transit routes are labelled by their main vehicle (Train or Bus) so they compare against Driving and Flight."""
+    mode = direction.get('travel_mode')
+    if mode != 'Transit':
+        return mode
+    vehicles = [trip.get('travel_mode', '') for trip in direction.get('trips') or []]
+    if any('train' in vehicle.lower() or 'rail' in vehicle.lower() for vehicle in vehicles):
+        return 'Train'
+    if any('bus' in vehicle.lower() for vehicle in vehicles):
+        return 'Bus'
+    return mode
+
+
+def _route_metrics(direction: dict) -> dict:
+    duration = direction.get('duration')
+    distance = direction.get('distance')
+    return {
+        "DurationMinutes": round(duration / 60, 1) if isinstance(duration, (int, float)) else _parse_duration_minutes(direction.get('formatted_duration')),
+        "DistanceKm": round(distance / 1000, 2) if isinstance(distance, (int, float)) else _parse_distance_km(direction.get('formatted_distance')),
+        "PriceINR": _parse_price_inr(direction.get('cost'), direction.get('currency')),
+    }
+
+
+def _flight_metrics(direction: dict) -> dict:
+    flight = direction.get('flight') or {}
+    duration = flight.get('nonstop_duration')  # seconds, like the duration of the other modes
+    round_trip = _parse_price_inr(flight.get('round_trip_price'), flight.get('currency'))
+    return {
+        "DurationMinutes": round(duration / 60, 1) if isinstance(duration, (int, float)) else _parse_duration_minutes(flight.get('formatted_nonstop_duration')),
+        "DistanceKm": _route_metrics(direction)["DistanceKm"],
+        "PriceINR": round(round_trip / 2, 2) if round_trip is not None else None,
+        "RoundTripPriceINR": round_trip,
+    }
+
+
+def _pareto_front(rows: list) -> list:
+    """Options for which no other option is both at least as fast and at least as cheap."""
+    priced = [row for row in rows if row["DurationMinutes"] is not None and row["PriceINR"] is not None]
+    return [
+        row for row in priced
+        if not any(
+            other["DurationMinutes"] <= row["DurationMinutes"] and other["PriceINR"] <= row["PriceINR"]
+            and (other["DurationMinutes"], other["PriceINR"]) != (row["DurationMinutes"], row["PriceINR"])
+            for other in priced
+        )
+    ]
+
+
+def compare_transport_modes(start_addr: str, dest_addr: str) -> dict:
+    """Returns one comparison table of all transport modes (Train, Bus, Driving, Flight) between start and destination address,
+    sorted by travel time, with the fastest option, the cheapest option and the options that are the best trade-off between time and price.
+
+    Args:
+        start_addr (str): Start Address of travel
+        dest_addr (str): Destination Address
+
+    Returns:
+        dict: status and the comparison table with duration in minutes, distance in km and one-way price in INR for each option
+    """
+
+    directions = _fetch_directions(start_addr, dest_addr)
+    if "directions" not in directions:
+        return {"status": "error", "error_message": "No Directions found."}
+
+    rows = []
+    for direction in directions["directions"]:
+        if direction.get('travel_mode') == 'Flight':
+            flight = direction.get('flight') or {}
+            metrics = _flight_metrics(direction)
+            details = f"{flight.get('airlines')} {flight.get('departure')} - {flight.get('arrival')}"
+            link = flight.get('google_flights_link')
+        else:
+            metrics = _route_metrics(direction)
+            details = direction.get('via') or direction.get('extensions')
+            link = None
+        rows.append({"Mode": _transit_mode(direction), **metrics, "Details": details, "Link": link})
+
+    rows.sort(key=lambda row: (row["DurationMinutes"] is None, row["DurationMinutes"] or 0))
+    timed = [row for row in rows if row["DurationMinutes"] is not None]
+    priced = [row for row in rows if row["PriceINR"] is not None]
+
+    return {
+        "status": "success",
+        "report": {
+            "Options": rows,
+            "Fastest": timed[0] if timed else None,
+            "Cheapest": min(priced, key=lambda row: row["PriceINR"]) if priced else None,
+            "ParetoFront": _pareto_front(rows),
+        },
+    }
+
+
+# Bulky tool results (a 20 hotel report, a full directions list) would otherwise stay
+# in the conversation on every later turn. Above the threshold they are saved as a
+# session artifact and the model gets a short digest plus a handle to expand on demand.
+_ARTIFACT_OFFLOAD_THRESHOLD_CHARS = int(os.getenv("ARTIFACT_OFFLOAD_THRESHOLD_CHARS", "4000"))  # 0 disables offloading
+_DIGEST_ITEMS = 5
+_DIGEST_FIELDS = (
+    "Name", "Link", "Check-In", "Check-Out", "HotelClass", "StartingRatePerNight", "UserRatings", "AverageDistanceKm",
+    "TravelMode", "Mode", "Airlines", "DurationMinutes", "DistanceKm", "PriceINR",
+)
+
+
+def _digest(value):
+    if isinstance(value, list):
+        return {"total_items": len(value), "top_items": [_digest(item) for item in value[:_DIGEST_ITEMS]]}
+    if isinstance(value, dict):
+        if any(field in value for field in _DIGEST_FIELDS):
+            return {field: value[field] for field in _DIGEST_FIELDS if field in value}
+        return {key: _digest(item) for key, item in value.items()}
+    return value
+
+
+async def offload_large_tool_result(tool, args: dict, tool_context: ToolContext, tool_response: dict):
+    """after_tool_callback: replaces a large tool result with a digest and the handle of the artifact holding it."""
+    if not _ARTIFACT_OFFLOAD_THRESHOLD_CHARS or tool.name == "expand_tool_result" or not isinstance(tool_response, dict):
+        return None
+    payload = json.dumps(tool_response, ensure_ascii=False)
+    if len(payload) <= _ARTIFACT_OFFLOAD_THRESHOLD_CHARS:
+        return None
+
+    handle = f"{tool.name}-{tool_context.function_call_id}.json"
+    try:
+        await tool_context.save_artifact(handle, types.Part.from_bytes(data=payload.encode(), mime_type="application/json"))
+    except ValueError:  # No artifact service configured for this runner, keep the result inline
+        return None
+    print(f"Offloaded {len(payload)} chars of {tool.name} result to artifact {handle}")
+    return {
+        "status": tool_response.get("status"),
+        "artifact_handle": handle,
+        "digest": _digest(tool_response.get("report")),
+        "note": "Only a digest is shown. Call expand_tool_result with artifact_handle to read the full result.",
+    }
+
+
+async def expand_tool_result(artifact_handle: str, tool_context: ToolContext, offset: int = 0, limit: int = 10) -> dict:
+    """Returns the full data of a tool result that was stored as an artifact, a page of items at a time.
+    Use this when the digest of a tool result does not have the details needed (booking links, check-in times, route descriptions, etc.)
+
+    Args:
+        artifact_handle (str): The artifact_handle returned with the digest
+        offset (int): Index of the first item to return
+        limit (int): Maximum number of items to return
+
+    Returns:
+        dict: status and the requested items of the stored tool result
+    """
+
+    artifact = await tool_context.load_artifact(artifact_handle)
+    if artifact is None:
+        return {"status": "error", "error_message": f"Result {artifact_handle} is no longer stored, please run the search again."}
+
+    result = json.loads(artifact.inline_data.data)
+    report = result.get("report")
+    if isinstance(report, dict):
+        # e.g. compare_transport_modes: its Options table (and any other list) is paged, single rows are kept
+        return {
+            "status": result.get("status"),
+            "total_items": {key: len(value) for key, value in report.items() if isinstance(value, list)},
+            "offset": offset,
+            "report": {key: value[offset:offset + limit] if isinstance(value, list) else value for key, value in report.items()},
+        }
+    if not isinstance(report, list):
+        return result
+    return {
+        "status": result.get("status"),
+        "total_items": len(report),
+        "offset": offset,
+        "report": report[offset:offset + limit],
+    }
+
+
 # Date Tool
 # Calendar Tool - to find holidays
 
@@ -160,9 +364,12 @@ root_agent = Agent(
     - For a source and destination city you will suggest all modes of transportation available and how much time will it take to cover the distance.
     - Be very professional and polite while asking any follow-up queries with users if required
     - If the user does not provide specific transport preferences, make reasonable assumptions and provide fastest transport mode available
+    - Use compare_transport_modes to compare travel time and price across modes; it already gives the fastest, cheapest and best trade-off options
     - Display all available directions formatted and share it user 
+    - Large tool results come back as a digest with an artifact_handle; call expand_tool_result only when you need details that are not in the digest
     """,
-    tools=[get_current_date, search_map_directions, search_directions_via_flight]
+    tools=[get_current_date, search_map_directions, search_directions_via_flight, compare_transport_modes, expand_tool_result],
+    after_tool_callback=offload_large_tool_result,
 )
 
 print(f"Agent '{root_agent.name}'.")
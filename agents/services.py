@@ -0,0 +1,101 @@
+"""Custom ADK services, loaded by `adk web` / `adk api_server` from the agents directory.
+
+Registers a persistent, size-bounded artifact store for the tool results the agents
+offload as artifacts:
+
+    adk api_server --artifact_service_uri "boundedfile://.adk_artifacts?max_mb=200" agents
+"""
+
+import asyncio
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from google.adk.artifacts import FileArtifactService
+from google.adk.cli.service_registry import get_service_registry
+
+
+class BoundedFileArtifactService(FileArtifactService):
+    """FileArtifactService that deletes the oldest artifact versions once the store grows past max_bytes.
+
+    The size of every version is kept in an index built from disk on the first save and
+    updated as versions are saved, evicted or deleted, so a save does not walk the store.
+    """
+
+    def __init__(self, root_dir: Path | str, max_bytes: int):
+        super().__init__(root_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = None  # version dir -> bytes, oldest first
+        self._total = 0
+
+    async def save_artifact(self, **kwargs) -> int:
+        version = await super().save_artifact(**kwargs)
+        artifact_dir, _ = self._artifact_dir(kwargs["app_name"], kwargs["user_id"], kwargs.get("session_id"), kwargs["filename"])
+        await asyncio.to_thread(self._track, artifact_dir / "versions" / str(version))
+        return version
+
+    async def delete_artifact(self, **kwargs) -> None:
+        artifact_dir, _ = self._artifact_dir(kwargs["app_name"], kwargs["user_id"], kwargs.get("session_id"), kwargs["filename"])
+        await super().delete_artifact(**kwargs)
+        with self._lock:
+            for version_dir in [path for path in self._sizes or {} if path.parent.parent == artifact_dir]:
+                self._total -= self._sizes.pop(version_dir)
+
+    @staticmethod
+    def _version_size(version_dir: Path) -> int | None:
+        # Another request may evict or delete the version while it is being measured
+        try:
+            return sum(path.stat().st_size for path in version_dir.iterdir() if path.is_file())
+        except FileNotFoundError:
+            return None
+
+    def _scan(self) -> OrderedDict:
+        versions = []
+        for metadata in self.root_dir.rglob("metadata.json"):
+            version_dir = metadata.parent
+            if version_dir.name.startswith("."):  # a .{version}.pending save still in progress
+                continue
+            size = self._version_size(version_dir)
+            try:
+                versions.append((version_dir.stat().st_mtime, version_dir, size))
+            except FileNotFoundError:
+                continue
+        return OrderedDict((version_dir, size) for _, version_dir, size in sorted(versions) if size is not None)
+
+    def _track(self, saved: Path) -> None:
+        with self._lock:
+            if self._sizes is None:
+                self._sizes = self._scan()
+                self._total = sum(self._sizes.values())
+            size = self._version_size(saved)
+            if size is not None and saved not in self._sizes:
+                self._sizes[saved] = size
+                self._total += size
+            self._evict(keep=saved)
+
+    def _evict(self, keep: Path) -> None:
+        for version_dir in list(self._sizes):
+            if self._total <= self.max_bytes:
+                break
+            if version_dir == keep:  # the version just saved is never evicted
+                continue
+            shutil.rmtree(version_dir, ignore_errors=True)
+            self._total -= self._sizes.pop(version_dir)
+            # Drop the artifact itself once its last version is gone, so it is no longer listed
+            for empty_dir in (version_dir.parent, version_dir.parent.parent):
+                try:
+                    empty_dir.rmdir()
+                except OSError:
+                    break
+
+
+def bounded_file_artifact_factory(uri: str, **_) -> BoundedFileArtifactService:
+    parsed = urlparse(uri)
+    max_mb = float(parse_qs(parsed.query).get("max_mb", ["200"])[0])
+    return BoundedFileArtifactService(root_dir=parsed.netloc + parsed.path, max_bytes=int(max_mb * 2**20))
+
+
+get_service_registry().register_artifact_service("boundedfile", bounded_file_artifact_factory)
@@ -0,0 +1,101 @@
+"""Benchmarks parsing of large SerpApi payloads: full json.loads vs streaming field projection.
+
+Builds a synthetic google_hotels / google_maps_directions payload (same shape as
+scripts/tests/load/fake_services.py, padded with extra images and reviews) and
+compares, for each engine:
+    full       json.loads of the whole body, what GoogleSearch.get_json() does
+    projected  json.loads followed by the per-tool field projection (no ijson)
+    streaming  ijson, one item at a time is built and projected
+
+Reports median parse time and tracemalloc peak memory per path.
+
+Usage:
+    python scripts/tests/bench_serpapi_parsing.py --properties 500 --repeat 5 --output bench.json
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).with_name("load")))
+from fake_services import _fake_directions, _fake_hotels
+
+AGENT_PATH = Path(__file__).resolve().parents[2] / "agents" / "customer-desk-agent" / "agent.py"
+
+
+def load_agent():
+    spec = importlib.util.spec_from_file_location("customer_desk_agent", AGENT_PATH)
+    agent = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(agent)
+    return agent
+
+
+def build_payloads(properties: int, padding: int) -> dict:
+    hotels = _fake_hotels({"q": "Hotels in Goa"}, count=properties)
+    for hotel in hotels["properties"]:
+        hotel["images"] = [{"thumbnail": f"https://example.com/thumb/{i}.jpg", "original_image": f"https://example.com/img/{i}.jpg"} for i in range(padding)]
+        hotel["reviews_breakdown"] *= padding // 4 or 1
+        hotel["prices"] = [{"source": f"Provider {i}", "rate_per_night": {"lowest": "₹5,000", "extracted_lowest": 5000}} for i in range(padding // 2)]
+    directions = _fake_directions({"start_addr": "Mumbai", "end_addr": "Goa"})
+    for direction in directions["directions"]:
+        direction["trips"] = [{"travel_mode": "Train", "title": f"Leg {i}", "details": [{"title": "Stop", "geo_photo": "x" * 200}] * padding} for i in range(10)]
+    return {
+        "google_hotels": json.dumps({"search_metadata": {"id": "bench"}, **hotels}).encode(),
+        "google_maps_directions": json.dumps({"search_metadata": {"id": "bench"}, **directions}).encode(),
+    }
+
+
+def measure(parse, repeat: int) -> dict:
+    """Times and memory are taken in separate runs, tracemalloc slows down the Python-heavy paths."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    result = parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return {"median_ms": round(statistics.median(timings) * 1000, 2), "peak_mb": round(peak / 2**20, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=500, help="hotels in the synthetic google_hotels payload")
+    parser.add_argument("--padding", type=int, default=40, help="images/reviews/prices per hotel, i.e. unused bulk")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    agent = load_agent()
+    if agent.ijson is None:
+        sys.exit("ijson is not installed, the streaming path is not available")
+
+    results = {}
+    for engine, body in build_payloads(args.properties, args.padding).items():
+        list_key, fields = agent._PAYLOAD_SCHEMAS[engine]
+        paths = {
+            "full": lambda: json.loads(body),
+            "projected": lambda: agent._project(json.loads(body)[list_key], fields),
+            "streaming": lambda: agent._stream_project(io.BytesIO(body), list_key, fields),
+        }
+        results[engine] = {"payload_mb": round(len(body) / 2**20, 2), **{name: measure(parse, args.repeat) for name, parse in paths.items()}}
+
+        print(f"{engine} ({results[engine]['payload_mb']} MB payload)")
+        for name in paths:
+            print(f"    {name:<10} {results[engine][name]['median_ms']:>9} ms  peak {results[engine][name]['peak_mb']:>7} MB")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+AGENTS_DIR = Path(__file__).resolve().parents[2] / "agents"
+
+
+def _load(directory: str):
+    spec = importlib.util.spec_from_file_location(directory.replace("-", "_"), AGENTS_DIR / directory / "agent.py")
+    agent = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(agent)
+    return agent
+
+
+@pytest.fixture(scope="session")
+def customer_desk_agent():
+    return _load("customer-desk-agent")
+
+
+@pytest.fixture(scope="session")
+def hotel_booking_agent():
+    return _load("hotel-booking-agent")
+
+
+@pytest.fixture(scope="session")
+def route_suggest_agent():
+    return _load("route-suggest-agent")
+
+
+@pytest.fixture(scope="session")
+def services():
+    spec = importlib.util.spec_from_file_location("agent_services", AGENTS_DIR / "services.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,221 @@
+"""Local stand-ins for the Gemini API and SerpApi used by the load test.
+
+Neither service does any real work: the fake LLM reads the latest user message
+and answers with the tool call (or transfer) the real model would make, and the
+fake SerpApi returns canned payloads shaped like the google_hotels,
+google_maps_directions and google_maps responses the agent tools parse.
+
+Point the agent at them with:
+    GOOGLE_GEMINI_BASE_URL=http://127.0.0.1:<llm_port>
+    SERP_API_BACKEND=http://127.0.0.1:<serpapi_port>
+
+Run standalone:
+    python scripts/tests/load/fake_services.py --llm-port 8081 --serpapi-port 8082
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HOTEL_PATTERN = re.compile(
+    r"hotels? in (?P<city>[A-Za-z ]+?) from (?P<start>\d{4}-\d{2}-\d{2}) to (?P<end>\d{4}-\d{2}-\d{2})(?: near (?P<places>[^.?!]+))?",
+    re.IGNORECASE,
+)
+ROUTE_PATTERN = re.compile(r"from (?P<src>[A-Za-z ]+?) to (?P<dst>[A-Za-z ]+?)(?: on\b|[.,?!]|$)", re.IGNORECASE)
+
+HOTEL_AGENT = "HotelBookingAgent"
+ROUTE_AGENT = "RouteFinderAndSuggestAgent"
+
+
+# ----- START: FAKE LLM -----
+
+def _latest_user_text(contents: list) -> str:
+    """Last message typed by the user. ADK re-sends other agents' turns as a user content starting with 'For context:', those are skipped."""
+    for content in reversed(contents):
+        texts = [part["text"] for part in content.get("parts", []) if part.get("text")]
+        if content.get("role") != "user" or not texts or texts[0].startswith("For context:"):
+            continue
+        return texts[-1]
+    return ""
+
+
+def _plan_next_step(request: dict) -> dict:
+    contents = request.get("contents", [])
+    tools = {
+        declaration["name"]
+        for tool in request.get("tools", [])
+        for declaration in tool.get("functionDeclarations", tool.get("function_declarations", []))
+    }
+
+    last_parts = contents[-1].get("parts", []) if contents else []
+    answered = [part["functionResponse"]["name"] for part in last_parts if "functionResponse" in part]
+    if answered:
+        return {"text": f"Here is a summary of the {', '.join(answered)} results for your trip."}
+
+    text = _latest_user_text(contents)
+    hotel = HOTEL_PATTERN.search(text)
+    route = ROUTE_PATTERN.search(text)
+
+    if hotel:
+        query = f"Hotels in {hotel['city'].strip()}"
+        if hotel["places"] and "rank_hotels_by_proximity" in tools:
+            places = [place.strip() for place in re.split(r",| and ", hotel["places"]) if place.strip()]
+            return {"functionCall": {"name": "rank_hotels_by_proximity", "args": {
+                "query": query, "city": hotel["city"].strip(), "start_date": hotel["start"],
+                "end_date": hotel["end"], "places_of_interest": places}}}
+        if "search_hotels" in tools:
+            return {"functionCall": {"name": "search_hotels", "args": {
+                "query": query, "start_date": hotel["start"], "end_date": hotel["end"]}}}
+        if "transfer_to_agent" in tools:
+            return {"functionCall": {"name": "transfer_to_agent", "args": {"agent_name": HOTEL_AGENT}}}
+
+    if route and not hotel:
+        args = {"start_addr": route["src"].strip(), "dest_addr": route["dst"].strip()}
+        for name in ("compare_transport_modes", "search_map_directions"):
+            if name in tools:
+                return {"functionCall": {"name": name, "args": args}}
+        if "transfer_to_agent" in tools:
+            return {"functionCall": {"name": "transfer_to_agent", "args": {"agent_name": ROUTE_AGENT}}}
+
+    return {"text": "Sure, tell me where you would like to travel and on which dates."}
+
+
+class FakeLlmHandler(BaseHTTPRequestHandler):
+    latency_ms = 0
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.latency_ms / 1000)
+
+        response = {
+            "candidates": [{
+                "content": {"role": "model", "parts": [_plan_next_step(request)]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 20, "totalTokenCount": 120},
+            "modelVersion": "fake-llm",
+        }
+
+        if "streamGenerateContent" in self.path:
+            body = f"data: {json.dumps(response)}\r\n\r\n".encode()
+            content_type = "text/event-stream"
+        else:
+            body = json.dumps(response).encode()
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+# ----- END: FAKE LLM -----
+
+
+# ----- START: FAKE SERPAPI -----
+
+def _fake_hotels(params: dict, count: int = 20) -> dict:
+    rng = random.Random(params.get("q", ""))
+    lat, lng = 15.0 + rng.random() * 10, 73.0 + rng.random() * 10
+    return {"properties": [{
+        "name": f"Hotel {i + 1} {params.get('q', '')}",
+        "link": f"https://example.com/hotel/{i + 1}",
+        "check_in_time": "12:00 PM",
+        "check_out_time": "11:00 AM",
+        "hotel_class": f"{rng.randint(2, 5)}-star hotel",
+        "rate_per_night": {"lowest": f"₹{rng.randint(1500, 15000):,}", "extracted_lowest": rng.randint(1500, 15000)},
+        "overall_rating": round(rng.uniform(3.0, 4.9), 1),
+        "gps_coordinates": {"latitude": lat + rng.uniform(-0.05, 0.05), "longitude": lng + rng.uniform(-0.05, 0.05)},
+        "nearby_places": [{"name": f"Landmark {j}", "transportations": [{"type": "Taxi", "duration": f"{j * 5} min"}]} for j in range(1, 4)],
+        "images": [{"thumbnail": f"https://example.com/img/{i}/{j}.jpg"} for j in range(10)],
+        "reviews_breakdown": [{"name": topic, "positive": rng.randint(0, 500), "negative": rng.randint(0, 100)} for topic in ("Location", "Service", "Property", "Food")],
+    } for i in range(count)]}
+
+
+def _fake_directions(params: dict) -> dict:
+    rng = random.Random(f"{params.get('start_addr')}->{params.get('end_addr')}")
+    km = rng.randint(150, 1500)
+    return {"directions": [
+        {"travel_mode": "Driving", "via": "NH48", "distance": km * 1000, "duration": km * 60,
+         "formatted_distance": f"{km:,} km", "formatted_duration": f"{km // 60} hr {km % 60} min", "extensions": ["Toll road"]},
+        {"travel_mode": "Transit", "distance": km * 1050, "duration": km * 80, "cost": km * 2, "currency": "INR",
+         "formatted_distance": f"{km:,} km", "formatted_duration": f"{km * 80 // 3600} hr", "trips": [{"travel_mode": "Train"}]},
+        {"travel_mode": "Transit", "distance": km * 1000, "duration": km * 90, "cost": km * 3, "currency": "INR",
+         "formatted_distance": f"{km:,} km", "formatted_duration": f"{km * 90 // 3600} hr", "trips": [{"travel_mode": "Bus"}]},
+        {"travel_mode": "Flight", "flight": {
+            "airlines": ["IndiGo"], "departure": "08:05", "arrival": "10:20", "currency": "INR",
+            "round_trip_price": f"₹{km * 12:,}", "nonstop_duration": 8100, "formatted_nonstop_duration": "2 hr 15 min",
+            "google_flights_link": "https://example.com/flights"}},
+    ]}
+
+
+def _fake_place(params: dict) -> dict:
+    rng = random.Random(params.get("q", ""))
+    return {"place_results": {"title": params.get("q"), "gps_coordinates": {
+        "latitude": 15.0 + rng.random() * 10, "longitude": 73.0 + rng.random() * 10}}}
+
+
+FAKE_ENGINES = {
+    "google_hotels": _fake_hotels,
+    "google_maps_directions": _fake_directions,
+    "google_maps": _fake_place,
+}
+
+
+class FakeSerpApiHandler(BaseHTTPRequestHandler):
+    latency_ms = 0
+
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        time.sleep(self.latency_ms / 1000)
+
+        engine = FAKE_ENGINES.get(params.get("engine"))
+        body = json.dumps(engine(params) if engine else {"error": f"Unsupported engine {params.get('engine')}"}).encode()
+        self.send_response(200 if engine else 400)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+# ----- END: FAKE SERPAPI -----
+
+
+def start_fake_services(llm_port: int, serpapi_port: int, llm_latency_ms: int = 0, serpapi_latency_ms: int = 0) -> list:
+    """Starts both fake servers on daemon threads and returns them so the caller can shut them down."""
+    servers = []
+    for port, handler, latency in (
+        (llm_port, FakeLlmHandler, llm_latency_ms),
+        (serpapi_port, FakeSerpApiHandler, serpapi_latency_ms),
+    ):
+        server = ThreadingHTTPServer(("127.0.0.1", port), type(handler.__name__, (handler,), {"latency_ms": latency}))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-port", type=int, default=8081)
+    parser.add_argument("--serpapi-port", type=int, default=8082)
+    parser.add_argument("--llm-latency-ms", type=int, default=300)
+    parser.add_argument("--serpapi-latency-ms", type=int, default=800)
+    args = parser.parse_args()
+
+    start_fake_services(args.llm_port, args.serpapi_port, args.llm_latency_ms, args.serpapi_latency_ms)
+    print(f"Fake LLM on :{args.llm_port}, fake SerpApi on :{args.serpapi_port}. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,354 @@
+"""Concurrent-user load test for the customer-desk-agent behind the ADK API server.
+
+Replays the multi-turn trip-planning conversations in conversations.json against
+/apps/<app>/users/<user>/sessions/<session> and /run, ramping the number of
+concurrent sessions stage by stage. Reports throughput, p50/p95/p99 latency per
+turn and per tool call, prefetch hit rate, error rate and API server memory growth, and writes
+everything to a JSON file so runs from different releases can be compared.
+
+Usage (starts the fakes and the ADK API server itself):
+    python scripts/tests/load/load_test.py --start-server --ramp 1,5,10,25 --stage-seconds 60 --output load_results.json
+
+Against an already running server (started with GOOGLE_GEMINI_BASE_URL and
+SERP_API_BACKEND pointing at fake_services.py):
+    python scripts/tests/load/load_test.py --server-url http://localhost:8000 --server-pid <pid> --no-fakes
+
+Compare with a previous run:
+    python scripts/tests/load/load_test.py --start-server --compare previous_results.json
+
+Per tool latencies are measured inside the API server: it appends them to the file
+named by TOOL_TIMINGS_PATH, which --start-server sets to --tool-timings. For an already
+running server, start it with TOOL_TIMINGS_PATH set and pass the same file.
+
+--app-name must be a valid Python identifier: ADK 2.x answers 404 for apps with
+hyphenated names such as the customer-desk-agent directory. --start-server therefore
+serves a temporary copy of agents/<--agent> (plus agents/services.py) named after
+--app-name. A server started by hand needs the same kind of copy.
+
+Exits non-zero when a stage completes no turn successfully.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from pathlib import Path
+
+from fake_services import start_fake_services
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_CONVERSATIONS = Path(__file__).with_name("conversations.json")
+
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 1),
+        "p50": round(rank(50), 1),
+        "p95": round(rank(95), 1),
+        "p99": round(rank(99), 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+def _rss_mb(pid) -> float | None:
+    """Resident memory of the API server process, read from /proc (Linux only)."""
+    if not pid:
+        return None
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+def _post(url: str, payload: dict, timeout: float):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read() or b"null")
+
+
+def _timings_offset(path) -> int:
+    try:
+        return path.stat().st_size if path else 0
+    except OSError:
+        return 0
+
+
+def _tool_timings(path, offset: int) -> tuple:
+    """(tool name -> [ms], latest prefetch metrics) from the lines the API server appended to TOOL_TIMINGS_PATH since offset."""
+    latencies, prefetch = {}, None
+    if not path:
+        return latencies, prefetch
+    try:
+        with path.open() as timings:
+            timings.seek(offset)
+            for line in timings:
+                if line.endswith("\n"):
+                    timing = json.loads(line)
+                    latencies.setdefault(timing["tool"], []).append(timing["ms"])
+                    prefetch = timing.get("prefetch") or prefetch
+    except OSError:
+        pass
+    return latencies, prefetch
+
+
+class Stage:
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.lock = threading.Lock()
+        self.turn_ms = []
+        self.errors = {}
+        self.turns = 0
+        self.conversations = 0
+
+    def record_turn(self, elapsed_ms: float):
+        with self.lock:
+            self.turns += 1
+            self.turn_ms.append(elapsed_ms)
+
+    def record_error(self, kind: str):
+        with self.lock:
+            self.turns += 1
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+def _run_conversation(args, stage: Stage, turns: list, deadline: float):
+    user_id = f"load-user-{uuid.uuid4().hex[:8]}"
+    session_id = f"{user_id}-{int(time.time())}"
+    try:
+        _post(f"{args.server_url}/apps/{args.app_name}/users/{user_id}/sessions/{session_id}", {}, args.timeout)
+    except (urllib.error.URLError, OSError) as e:
+        stage.record_error(f"session: {type(e).__name__}")
+        return
+
+    for text in turns:
+        if time.monotonic() > deadline:
+            return
+        payload = {
+            "app_name": args.app_name,
+            "user_id": user_id,
+            "session_id": session_id,
+            "new_message": {"parts": [{"text": text}], "role": "user"},
+        }
+        started = time.perf_counter()
+        try:
+            _post(f"{args.server_url}/run", payload, args.timeout)
+        except urllib.error.HTTPError as e:
+            stage.record_error(f"http {e.code}")
+            return
+        except (urllib.error.URLError, OSError) as e:
+            stage.record_error(type(e).__name__)
+            return
+        stage.record_turn((time.perf_counter() - started) * 1000)
+        if args.think_time_ms:
+            time.sleep(random.uniform(0, args.think_time_ms) / 1000)
+
+    with stage.lock:
+        stage.conversations += 1
+
+
+def run_stage(args, concurrency: int, conversations: list) -> dict:
+    stage = Stage(concurrency)
+    deadline = time.monotonic() + args.stage_seconds
+    rss_samples = [_rss_mb(args.server_pid)]
+    timings_offset = _timings_offset(args.tool_timings)
+
+    def worker():
+        while time.monotonic() < deadline:
+            _run_conversation(args, stage, random.choice(conversations), deadline)
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in workers:
+        thread.start()
+    while any(thread.is_alive() for thread in workers):
+        time.sleep(1)
+        rss_samples.append(_rss_mb(args.server_pid))
+    elapsed = time.monotonic() - started
+
+    rss = [sample for sample in rss_samples if sample is not None]
+    failed = sum(stage.errors.values())
+    tool_ms, prefetch = _tool_timings(args.tool_timings, timings_offset)
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 1),
+        "conversations_completed": stage.conversations,
+        "turns": stage.turns,
+        "successful_turns": stage.turns - failed,
+        "throughput_turns_per_s": round((stage.turns - failed) / elapsed, 2) if elapsed else 0,
+        "error_rate": round(failed / stage.turns, 4) if stage.turns else 0,
+        "errors": stage.errors,
+        "turn_latency_ms": _percentiles(stage.turn_ms),
+        "tool_latency_ms": {name: _percentiles(values) for name, values in sorted(tool_ms.items())},
+        "prefetch_since_server_start": prefetch,
+        "server_rss_mb": {
+            "start": rss[0], "end": rss[-1], "peak": max(rss), "growth": round(rss[-1] - rss[0], 1),
+        } if rss else None,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _stage_agents_dir(args) -> Path:
+    """Copies the agent under test into a temp agents dir, under the identifier-safe --app-name."""
+    agents_dir = Path(tempfile.mkdtemp(prefix="load_test_agents_"))
+    ignore = shutil.ignore_patterns("__pycache__", ".adk", ".env")
+    shutil.copytree(REPO_ROOT / "agents" / args.agent, agents_dir / args.app_name, ignore=ignore)
+    shutil.copy(REPO_ROOT / "agents" / "services.py", agents_dir / "services.py")
+    return agents_dir
+
+
+def _start_api_server(args, agents_dir: Path):
+    env = {
+        **os.environ,
+        "GOOGLE_GEMINI_BASE_URL": f"http://127.0.0.1:{args.llm_port}",
+        "GOOGLE_GENAI_USE_VERTEXAI": "FALSE",
+        "GOOGLE_API_KEY": "fake-key",
+        "SERP_API_KEY": "fake-key",
+        "SERP_API_BACKEND": f"http://127.0.0.1:{args.serpapi_port}",
+        # The agents' .env files would otherwise replace the fake keys above
+        "ADK_DISABLE_LOAD_DOTENV": "1",
+        "TOOL_TIMINGS_PATH": str(args.tool_timings),
+    }
+    port = args.server_url.rsplit(":", 1)[-1]
+    server = subprocess.Popen(
+        ["adk", "api_server", "--port", port, str(agents_dir)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(60):
+        try:
+            urllib.request.urlopen(f"{args.server_url}/list-apps", timeout=1)
+            return server
+        except (urllib.error.URLError, OSError):
+            time.sleep(1)
+    server.terminate()
+    sys.exit("ADK API server did not come up within 60s")
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value}ms"
+
+
+def _print_stage(result: dict, previous: dict | None = None):
+    turn = result["turn_latency_ms"]
+    line = (f"c={result['concurrency']:>3}  {result['throughput_turns_per_s']:>6} turns/s  "
+            f"p50={_ms(turn.get('p50'))} p95={_ms(turn.get('p95'))} p99={_ms(turn.get('p99'))}  "
+            f"errors={result['error_rate']:.2%}")
+    if result["server_rss_mb"]:
+        line += f"  rss+{result['server_rss_mb']['growth']}MB"
+    if previous:
+        before = previous["turn_latency_ms"]
+        line += "  | vs previous: "
+        if turn.get("p95") is not None and before.get("p95") is not None:
+            line += f"p95 {turn['p95'] - before['p95']:+.1f}ms, "
+        line += f"throughput {result['throughput_turns_per_s'] - previous['throughput_turns_per_s']:+.2f}/s"
+    print(line)
+    for name, tool in result["tool_latency_ms"].items():
+        print(f"        {name:<28} n={tool['count']:<5} p50={tool['p50']}ms p95={tool['p95']}ms p99={tool['p99']}ms")
+    prefetch = result["prefetch_since_server_start"]
+    if prefetch:
+        print(f"        prefetch since server start: issued={prefetch['issued']} hits={prefetch['hits']} "
+              f"wasted={prefetch['wasted']} skipped={prefetch['skipped']} hit_rate={prefetch['hit_rate']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server-url", default="http://localhost:8000")
+    parser.add_argument("--app-name", default="customer_desk_agent", help="must be a valid Python identifier, see above")
+    parser.add_argument("--agent", default="customer-desk-agent", help="directory under agents/ that --start-server serves as --app-name")
+    parser.add_argument("--server-pid", type=int, help="PID of the API server, for memory sampling")
+    parser.add_argument("--start-server", action="store_true", help="launch `adk api_server` wired to the fakes")
+    parser.add_argument("--no-fakes", action="store_true", help="do not start the fake LLM/SerpApi")
+    parser.add_argument("--llm-port", type=int, default=8081)
+    parser.add_argument("--serpapi-port", type=int, default=8082)
+    parser.add_argument("--llm-latency-ms", type=int, default=300)
+    parser.add_argument("--serpapi-latency-ms", type=int, default=800)
+    parser.add_argument("--conversations", type=Path, default=DEFAULT_CONVERSATIONS)
+    parser.add_argument("--ramp", default="1,5,10,25", help="comma separated concurrent sessions per stage")
+    parser.add_argument("--stage-seconds", type=int, default=60)
+    parser.add_argument("--think-time-ms", type=int, default=500, help="max random pause between turns")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", type=Path, default=Path("load_results.json"))
+    parser.add_argument("--compare", type=Path, help="previous results JSON to diff against")
+    parser.add_argument("--tool-timings", type=Path, help="TOOL_TIMINGS_PATH of the API server (a temp file with --start-server)")
+    args = parser.parse_args()
+    args.server_url = args.server_url.rstrip("/")
+    if args.start_server and not args.tool_timings:
+        args.tool_timings = Path(tempfile.mkstemp(prefix="tool_timings_", suffix=".jsonl")[1])
+
+    conversations = json.loads(args.conversations.read_text())
+    previous = json.loads(args.compare.read_text()) if args.compare else None
+    previous_stages = {stage["concurrency"]: stage for stage in (previous or {}).get("stages", [])}
+
+    if not args.no_fakes:
+        start_fake_services(args.llm_port, args.serpapi_port, args.llm_latency_ms, args.serpapi_latency_ms)
+    if args.start_server and not args.app_name.isidentifier():
+        sys.exit(f"--app-name '{args.app_name}' is not a valid Python identifier, ADK would answer 404")
+    agents_dir = _stage_agents_dir(args) if args.start_server else None
+    server = _start_api_server(args, agents_dir) if agents_dir else None
+    if server and not args.server_pid:
+        args.server_pid = server.pid
+
+    results = {
+        "meta": {
+            "app_name": args.app_name,
+            "git_revision": _git_revision(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "stage_seconds": args.stage_seconds,
+            "think_time_ms": args.think_time_ms,
+            "llm_latency_ms": None if args.no_fakes else args.llm_latency_ms,
+            "serpapi_latency_ms": None if args.no_fakes else args.serpapi_latency_ms,
+            "conversations": len(conversations),
+        },
+        "stages": [],
+    }
+
+    failed_stage = None
+    try:
+        for concurrency in (int(value) for value in args.ramp.split(",")):
+            result = run_stage(args, concurrency, conversations)
+            results["stages"].append(result)
+            _print_stage(result, previous_stages.get(concurrency))
+            if not result["successful_turns"]:
+                failed_stage = result
+                break
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        if agents_dir:
+            shutil.rmtree(agents_dir, ignore_errors=True)
+
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {args.output}")
+    if failed_stage:
+        sys.exit(f"Aborted: no turn succeeded at c={failed_stage['concurrency']} (errors: {failed_stage['errors']}). "
+                 f"Check --server-url and that --app-name '{args.app_name}' is served.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+from google.genai import types
+
+
+class _ToolContext:
+    """Just enough of ToolContext for the offload callback and expand_tool_result."""
+
+    function_call_id = "call-1"
+
+    def __init__(self):
+        self.artifacts = {}
+
+    async def save_artifact(self, filename, artifact):
+        self.artifacts[filename] = artifact
+        return 0
+
+    async def load_artifact(self, filename):
+        return self.artifacts.get(filename)
+
+
+class _Tool:
+    def __init__(self, name):
+        self.name = name
+
+
+@pytest.fixture(params=["customer_desk_agent", "route_suggest_agent"])
+def agent(request):
+    return request.getfixturevalue(request.param)
+
+
+def _hotels(count):
+    return [{
+        "Name": f"Hotel {i}", "Link": f"https://example.com/{i}", "Check-In": "12:00 PM", "Check-Out": "11:00 AM",
+        "HotelClass": "4-star hotel", "StartingRatePerNight": "₹4,000", "UserRatings": 4.2, "NearbyPlaces": ["x" * 400],
+    } for i in range(count)]
+
+
+def test_digest_keeps_booking_details_of_the_top_hotels(agent):
+    context = _ToolContext()
+
+    digest = asyncio.run(agent.offload_large_tool_result(_Tool("search_hotels"), {}, context, {"status": "success", "report": _hotels(20)}))
+
+    assert digest["artifact_handle"] in context.artifacts
+    top = digest["digest"]["top_items"][0]
+    assert top["Link"] == "https://example.com/0"
+    assert (top["Check-In"], top["Check-Out"]) == ("12:00 PM", "11:00 AM")
+    assert "NearbyPlaces" not in top
+
+
+def test_expand_tool_result_pages_the_options_of_a_comparison(agent):
+    context = _ToolContext()
+    report = {"Options": [{"Mode": "Train", "Details": i} for i in range(12)], "Fastest": {"Mode": "Flight"}, "ParetoFront": []}
+    context.artifacts["compare.json"] = types.Part.from_bytes(
+        data=json.dumps({"status": "success", "report": report}).encode(), mime_type="application/json")
+
+    page = asyncio.run(agent.expand_tool_result("compare.json", context, offset=10, limit=5))
+
+    assert page["total_items"] == {"Options": 12, "ParetoFront": 0}
+    assert [option["Details"] for option in page["report"]["Options"]] == [10, 11]
+    assert page["report"]["Fastest"] == {"Mode": "Flight"}
+
+
+def _save(store, filename, size, session_id="s1"):
+    part = types.Part.from_bytes(data=b"x" * size, mime_type="application/octet-stream")
+    return asyncio.run(store.save_artifact(app_name="app", user_id="u", session_id=session_id, filename=filename, artifact=part))
+
+
+def _keys(store, session_id="s1"):
+    return asyncio.run(store.list_artifact_keys(app_name="app", user_id="u", session_id=session_id))
+
+
+def test_store_evicts_the_oldest_versions_past_max_bytes(services, tmp_path):
+    store = services.BoundedFileArtifactService(root_dir=tmp_path, max_bytes=25_000)
+    for i in range(5):
+        _save(store, f"result-{i}.json", 10_000)
+
+    assert _keys(store) == ["result-3.json", "result-4.json"]
+    assert store._total <= 25_000
+
+    # A fresh instance builds its index from what is on disk
+    reopened = services.BoundedFileArtifactService(root_dir=tmp_path, max_bytes=25_000)
+    _save(reopened, "result-5.json", 10_000)
+    assert _keys(reopened) == ["result-4.json", "result-5.json"]
+
+
+def test_store_index_follows_deletes(services, tmp_path):
+    store = services.BoundedFileArtifactService(root_dir=tmp_path, max_bytes=25_000)
+    _save(store, "a.json", 10_000)
+    _save(store, "b.json", 10_000)
+    asyncio.run(store.delete_artifact(app_name="app", user_id="u", session_id="s1", filename="a.json"))
+    _save(store, "c.json", 10_000)
+
+    assert _keys(store) == ["b.json", "c.json"]
+
+
+def test_store_ignores_versions_that_vanish_while_measured(services, tmp_path):
+    store = services.BoundedFileArtifactService(root_dir=tmp_path, max_bytes=25_000)
+    assert store._version_size(tmp_path / "gone" / "versions" / "0") is None
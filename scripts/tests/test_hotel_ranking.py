@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+
+@pytest.fixture(params=["customer_desk_agent", "hotel_booking_agent"])
+def agent(request):
+    return request.getfixturevalue(request.param)
+
+
+def _hotel(name, lat, lng):
+    return {"Name": name, "StartingRatePerNight": "₹4,000", "GpsCoordinates": {"latitude": lat, "longitude": lng}}
+
+
+def _buckets(agent, hotels):
+    buckets = {}
+    for hotel in hotels:
+        gps = hotel["GpsCoordinates"]
+        buckets.setdefault(agent._geohash(gps["latitude"], gps["longitude"]), []).append(hotel)
+    return buckets
+
+
+def _nearest_names(agent, hotels, lat, lng, count):
+    return [hotel["Name"] for hotel in sorted(hotels, key=lambda hotel: agent._hotel_distance_km(hotel, lat, lng))[:count]]
+
+
+def test_geohash_block_is_the_cell_and_its_neighbours(agent):
+    block = agent._geohash_block(26.9124, 75.7873, 6)
+    assert len(block) == 9
+    assert agent._geohash(26.9124, 75.7873, 6) in block
+
+
+def test_nearby_hotels_finds_hotel_across_a_cell_border(agent):
+    # Put the place of interest 20m west of a geohash-5 border and one hotel 20m east of it,
+    # with a few more hotels further away inside the place's own geohash-6 cell.
+    _, width = agent._geohash_cell_size(5)
+    border = -180.0 + round((75.79 + 180.0) / width) * width
+    lat = 26.9124
+    hotels = [_hotel("Across the street", lat, border + 0.0002)]
+    hotels += [_hotel(f"Down the road {i}", lat, border - 0.004 - 0.001 * i) for i in range(5)]
+    assert agent._geohash(lat, border - 0.0002, 5) != agent._geohash(lat, border + 0.0002, 5)
+
+    found = agent._nearby_hotels(_buckets(agent, hotels), lat, border - 0.0002, 3)
+
+    names = [hotel["Name"] for hotel in found]
+    assert "Across the street" in names
+    assert set(_nearest_names(agent, hotels, lat, border - 0.0002, 3)) <= set(names)
+
+
+def test_nearby_hotels_always_holds_the_nearest(agent):
+    rng = random.Random(7)
+    for _ in range(200):
+        lat, lng = rng.uniform(8, 32), rng.uniform(68, 92)
+        spread = rng.choice([0.01, 0.05, 0.3])
+        hotels = [_hotel(str(i), lat + rng.uniform(-spread, spread), lng + rng.uniform(-spread, spread)) for i in range(20)]
+        poi_lat, poi_lng = lat + rng.uniform(-spread, spread), lng + rng.uniform(-spread, spread)
+        top_n = rng.randint(1, 8)
+
+        found = agent._nearby_hotels(_buckets(agent, hotels), poi_lat, poi_lng, top_n)
+
+        assert set(_nearest_names(agent, hotels, poi_lat, poi_lng, top_n)) <= {hotel["Name"] for hotel in found}
+
+
+def test_rank_hotels_searches_again_once_the_index_expires(agent, monkeypatch):
+    searches = []
+
+    def search_hotels(query, start_date, end_date):
+        searches.append(query)
+        agent._index_hotels(query, start_date, end_date, [_hotel("Near", 26.92, 75.82), _hotel("Far", 26.99, 75.85)])
+
+    monkeypatch.setattr(agent, "search_hotels", search_hotels)
+    monkeypatch.setattr(agent, "_geocode_place", lambda place, city: (26.9239, 75.8267))
+    agent._hotel_index.clear()
+
+    result = agent.rank_hotels_by_proximity("Hotels in Jaipur", "Jaipur", "2026-11-06", "2026-11-08", ["Hawa Mahal"], top_n=1)
+    assert result["report"][0]["Name"] == "Near"
+    agent.rank_hotels_by_proximity("Hotels in Jaipur", "Jaipur", "2026-11-06", "2026-11-08", ["Hawa Mahal"], top_n=1)
+    assert len(searches) == 1
+
+    for key, (_, buckets) in agent._hotel_index.items():
+        agent._hotel_index[key] = (0.0, buckets)
+    agent.rank_hotels_by_proximity("Hotels in Jaipur", "Jaipur", "2026-11-06", "2026-11-08", ["Hawa Mahal"], top_n=1)
+    assert len(searches) == 2
+
+
+def test_hotel_index_is_bounded(agent, monkeypatch):
+    monkeypatch.setattr(agent, "_INDEX_MAX_ENTRIES", 3)
+    agent._hotel_index.clear()
+    for day in range(1, 6):
+        agent._index_hotels("Hotels in Goa", f"2026-11-0{day}", "2026-11-10", [_hotel("Beach", 15.5, 73.8)])
+    assert len(agent._hotel_index) == 3
@@ -0,0 +1,91 @@
+import pytest
+from google.genai import types
+
+
+class _ToolContext:
+    """Just enough of ToolContext for prefetch_follow_up: session state and the user's message."""
+
+    def __init__(self, state):
+        self.state = state
+        self.user_content = None
+
+    def says(self, text):
+        self.user_content = types.Content(role="user", parts=[types.Part(text=text)])
+        return self
+
+
+class _Tool:
+    def __init__(self, name):
+        self.name = name
+
+
+class _InlinePool:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def agent(customer_desk_agent, monkeypatch):
+    calls = []
+
+    def fetch(params):
+        calls.append(params)
+        if params["engine"] == "google_hotels":
+            return {"properties": [{"name": "Taj", "rate_per_night": {"lowest": "₹4,000"},
+                                    "gps_coordinates": {"latitude": 15.5, "longitude": 73.8}}]}
+        return {"directions": [{"travel_mode": "Driving", "duration": 36000, "distance": 600000}]}
+
+    monkeypatch.setattr(customer_desk_agent, "_TOOL_CACHE_PATH", None)
+    monkeypatch.setattr(customer_desk_agent, "_fetch_projected", fetch)
+    monkeypatch.setattr(customer_desk_agent, "_prefetch_pool", _InlinePool())
+    monkeypatch.setattr(customer_desk_agent, "_prefetch_metrics", {"issued": 0, "hits": 0, "wasted": 0, "skipped": 0})
+    customer_desk_agent._tool_cache.clear()
+    customer_desk_agent._hotel_index.clear()
+    monkeypatch.setattr(customer_desk_agent, "serpapi_calls", calls, raising=False)
+    yield customer_desk_agent
+    customer_desk_agent._tool_cache.clear()
+    customer_desk_agent._hotel_index.clear()
+
+
+def test_route_then_hotels(agent):
+    state = {}
+    route = {"start_addr": "Mumbai", "dest_addr": "Goa"}
+    agent.compare_transport_modes(**route)
+    agent.prefetch_follow_up(_Tool("compare_transport_modes"), route, _ToolContext(state).says("How do I travel from Mumbai to Goa on 2026-12-18?"), {})
+
+    # A single travel date is taken as check-in for a stay of PREFETCH_STAY_NIGHTS
+    assert agent.prefetch_metrics()["issued"] == 1
+    agent.search_hotels("Hotels in Goa", "2026-12-18", "2026-12-20")
+    assert agent.prefetch_metrics()["hits"] == 1
+
+    hotels = {"query": "Hotels in Goa", "start_date": "2026-12-18", "end_date": "2026-12-20"}
+    agent.prefetch_follow_up(_Tool("search_hotels"), hotels, _ToolContext(state).says("Find hotels in Goa from 2026-12-18 to 2026-12-20"), {})
+
+    # Only the return leg goes out, the way there is already cached
+    metrics = agent.prefetch_metrics()
+    assert metrics["issued"] == 2
+    assert [(params["engine"], params.get("start_addr")) for params in agent.serpapi_calls] == [
+        ("google_maps_directions", "Mumbai"), ("google_hotels", None), ("google_maps_directions", "Goa")]
+
+
+def test_hotels_then_route(agent):
+    state = {}
+    hotels = {"query": "Hotels in Varanasi", "start_date": "2026-12-25", "end_date": "2026-12-28"}
+    agent.search_hotels(**hotels)
+    context = _ToolContext(state).says("Find hotels in Varanasi from 2026-12-25 to 2026-12-28. We are coming from Kolkata.")
+    agent.prefetch_follow_up(_Tool("search_hotels"), hotels, context, {})
+
+    assert agent.prefetch_metrics()["issued"] == 2  # Kolkata -> Varanasi and back
+    agent.compare_transport_modes("Kolkata", "Varanasi")
+    agent.compare_transport_modes("Varanasi", "Kolkata")
+
+    metrics = agent.prefetch_metrics()
+    assert (metrics["issued"], metrics["hits"], metrics["hit_rate"]) == (2, 2, 1.0)
+    assert len(agent.serpapi_calls) == 3
+
+
+def test_hotels_without_a_known_origin_prefetch_nothing(agent):
+    hotels = {"query": "Hotels in Jaipur", "start_date": "2026-11-06", "end_date": "2026-11-09"}
+    agent.prefetch_follow_up(_Tool("search_hotels"), hotels, _ToolContext({}).says("Find hotels in Jaipur from 2026-11-06 to 2026-11-09"), {})
+
+    assert agent.prefetch_metrics()["issued"] == 0
@@ -0,0 +1,74 @@
+import pytest
+
+
+@pytest.fixture(params=["customer_desk_agent", "route_suggest_agent"])
+def agent(request):
+    return request.getfixturevalue(request.param)
+
+
+@pytest.mark.parametrize("text, minutes", [
+    ("5 hr 20 min", 320.0),
+    ("1 day 2 hours", 1560.0),
+    ("45 mins", 45.0),
+    ("2h 15m", 135.0),
+    ("2 hours 30 minutes", 150.0),
+    ("45 minutes", 45.0),
+    ("1 hour 1 minute", 61.0),
+    ("", None),
+    (None, None),
+])
+def test_parse_duration_minutes(agent, text, minutes):
+    assert agent._parse_duration_minutes(text) == minutes
+
+
+@pytest.mark.parametrize("text, km", [
+    ("1,420 km", 1420.0),
+    ("850 m", 0.85),
+    ("12.5 km", 12.5),
+    ("no distance", None),
+])
+def test_parse_distance_km(agent, text, km):
+    assert agent._parse_distance_km(text) == km
+
+
+@pytest.mark.parametrize("value, currency, price", [
+    ("₹4,520", "INR", 4520.0),
+    ("Rs. 4,520", None, 4520.0),
+    ("INR 1,299.50", "INR", 1299.5),
+    (3000, "INR", 3000.0),
+    ("$120", "USD", None),
+    (None, "INR", None),
+])
+def test_parse_price_inr(agent, value, currency, price):
+    assert agent._parse_price_inr(value, currency) == price
+
+
+def test_flight_metrics_reads_nonstop_duration_as_seconds(agent):
+    direction = {"travel_mode": "Flight", "formatted_distance": "1,150 km", "flight": {
+        "round_trip_price": "₹9,000", "currency": "INR", "nonstop_duration": 8100, "formatted_nonstop_duration": "2 hr 15 min"}}
+
+    metrics = agent._flight_metrics(direction)
+
+    assert metrics["DurationMinutes"] == 135.0
+    assert metrics["DistanceKm"] == 1150.0
+    assert metrics["PriceINR"] == 4500.0
+    assert metrics["RoundTripPriceINR"] == 9000.0
+
+
+def test_flight_metrics_falls_back_to_formatted_duration(agent):
+    direction = {"flight": {"formatted_nonstop_duration": "1 hr 50 min"}}
+    assert agent._flight_metrics(direction)["DurationMinutes"] == 110.0
+
+
+def test_compare_transport_modes_compares_one_way_prices(agent, monkeypatch):
+    directions = {"directions": [
+        {"travel_mode": "Transit", "duration": 36000, "distance": 600000, "cost": 5000, "currency": "INR", "trips": [{"travel_mode": "Train"}]},
+        {"travel_mode": "Flight", "flight": {"round_trip_price": "₹8,000", "currency": "INR", "nonstop_duration": 5400}},
+    ]}
+    monkeypatch.setattr(agent, "_fetch_directions", lambda start_addr, dest_addr: directions)
+
+    report = agent.compare_transport_modes("Mumbai", "Goa")["report"]
+
+    assert report["Fastest"]["Mode"] == "Flight"
+    assert report["Cheapest"]["Mode"] == "Flight"
+    assert [row["Mode"] for row in report["ParetoFront"]] == ["Flight"]
@@ -0,0 +1,102 @@
+import io
+
+import pytest
+
+
+@pytest.fixture
+def agent(customer_desk_agent, monkeypatch):
+    monkeypatch.setattr(customer_desk_agent, "_TOOL_CACHE_PATH", None)
+    monkeypatch.setattr(customer_desk_agent, "_prefetch_metrics", {"issued": 0, "hits": 0, "wasted": 0, "skipped": 0})
+    customer_desk_agent._tool_cache.clear()
+    yield customer_desk_agent
+    customer_desk_agent._tool_cache.clear()
+
+
+def _fake_fetch(agent, monkeypatch, payloads):
+    calls = []
+
+    def fetch(params):
+        calls.append(params)
+        return payloads[min(len(calls), len(payloads)) - 1]
+
+    monkeypatch.setattr(agent, "_fetch_projected", fetch)
+    return calls
+
+
+def test_identical_lookups_share_one_call(agent, monkeypatch):
+    calls = _fake_fetch(agent, monkeypatch, [{"properties": [{"name": "Taj"}]}])
+
+    agent._serpapi_get_json({"engine": "google_hotels", "q": "Hotels in Goa"})
+    agent._serpapi_get_json({"engine": "google_hotels", "q": "hotels in  goa", "api_key": "other"})
+
+    assert len(calls) == 1
+
+
+def test_error_payloads_are_not_cached(agent, monkeypatch):
+    calls = _fake_fetch(agent, monkeypatch, [{"error": "Rate limited"}, {"properties": [{"name": "Taj"}]}])
+    params = {"engine": "google_hotels", "q": "Hotels in Goa"}
+
+    assert agent._serpapi_get_json(params) == {"error": "Rate limited"}
+    assert not agent._tool_cache_has(params)
+    assert agent._serpapi_get_json(params) == {"properties": [{"name": "Taj"}]}
+    assert len(calls) == 2
+
+
+def test_expired_unused_prefetch_counts_as_wasted(agent, monkeypatch):
+    _fake_fetch(agent, monkeypatch, [{"properties": []}])
+    agent._prefetch_context.active = True
+    try:
+        agent._serpapi_get_json({"engine": "google_hotels", "q": "Hotels in Goa"})
+    finally:
+        agent._prefetch_context.active = False
+    for entry in agent._tool_cache.values():
+        entry["expires_at"] = 0.0
+
+    metrics = agent.prefetch_metrics()
+
+    assert metrics["issued"] == 1
+    assert metrics["wasted"] == 1
+    assert not agent._tool_cache
+
+
+def test_stream_project_keeps_only_the_listed_fields(agent):
+    pytest.importorskip("ijson")
+    body = b'{"search_metadata": {"id": "1"}, "properties": [{"name": "Taj", "images": [1, 2], "rate_per_night": {"lowest": "4,000", "before_taxes": "3,500"}}]}'
+
+    payload = agent._stream_project(io.BytesIO(body), "properties", agent._HOTEL_FIELDS)
+
+    assert payload == {"properties": [{"name": "Taj", "rate_per_night": {"lowest": "4,000"}}]}
+
+
+@pytest.mark.parametrize("body, payload", [
+    (b'{"search_metadata": {"id": "1"}, "error": "Google hasn\'t returned any results for this query."}',
+     {"error": "Google hasn't returned any results for this query."}),
+    (b'{"search_metadata": {"id": "1"}, "properties": []}', {"properties": []}),
+])
+def test_stream_project_keeps_the_error_of_a_payload_without_items(agent, body, payload):
+    pytest.importorskip("ijson")
+    assert agent._stream_project(io.BytesIO(body), "properties", agent._HOTEL_FIELDS) == payload
+
+
+def test_errors_and_empty_results_are_not_persisted(agent, monkeypatch, tmp_path):
+    monkeypatch.setattr(agent, "_TOOL_CACHE_PATH", str(tmp_path / "tool_cache.sqlite"))
+    monkeypatch.setattr(agent._tool_cache_db_local, "connection", None, raising=False)
+
+    agent._persist("error", {"error": "Rate limited"}, 60)
+    agent._persist("empty", {"properties": []}, 60)
+    agent._persist("hotels", {"properties": [{"name": "Taj"}]}, 60)
+
+    assert agent._load_persisted("error") is None
+    assert agent._load_persisted("empty") is None
+    assert agent._load_persisted("hotels")[0] == {"properties": [{"name": "Taj"}]}
+
+
+def test_persist_purges_expired_rows(agent, monkeypatch, tmp_path):
+    monkeypatch.setattr(agent, "_TOOL_CACHE_PATH", str(tmp_path / "tool_cache.sqlite"))
+    monkeypatch.setattr(agent._tool_cache_db_local, "connection", None, raising=False)
+
+    agent._persist("stale", {"properties": [{"name": "Old"}]}, -1)
+    agent._persist("fresh", {"properties": [{"name": "New"}]}, 60)
+
+    keys = [row[0] for row in agent._tool_cache_db().execute("SELECT key FROM tool_cache")]
+    assert keys == ["fresh"]
@@ -0,0 +1,150 @@
+"""Warms the customer-desk-agent tool cache ahead of peak traffic.
+
+Runs the search_hotels lookup for each popular destination over the upcoming date
+windows and the directions lookup for each popular city pair (both ways), concurrently
+and within a SerpApi call budget. Results are written to the sqlite tool cache
+at TOOL_CACHE_PATH, which the API server reads when started with the same path.
+Lookups that are already warm are skipped and do not count against the budget.
+A lookup only counts as warmed once its result is in the cache; SerpApi errors and
+empty results are not cached and are reported as failed.
+
+Usage:
+    SERP_API_KEY=... python scripts/warm_tool_cache.py --config scripts/popular_routes.json \\
+        --cache-path .cache/tool_cache.sqlite3 --max-calls 150 --ttl-hours 12
+
+Config (see scripts/popular_routes.json):
+    destinations  cities to warm search_hotels for
+    city_pairs    [origin, destination] pairs to warm directions for
+    weekends      number of upcoming Friday-Sunday stays to cover
+    date_windows  extra [check_in, check_out] pairs in YYYY-MM-DD format
+"""
+
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+AGENT_PATH = REPO_ROOT / "agents" / "customer-desk-agent" / "agent.py"
+
+
+def upcoming_weekends(count: int, today: datetime.date) -> list:
+    """Friday check-in, Sunday check-out for the next `count` weekends, starting with this one if Friday is not past."""
+    friday = today + datetime.timedelta(days=(4 - today.weekday()) % 7)
+    return [
+        ((friday + datetime.timedelta(weeks=week)).isoformat(), (friday + datetime.timedelta(weeks=week, days=2)).isoformat())
+        for week in range(count)
+    ]
+
+
+def load_agent(cache_path: str):
+    # The agent module reads TOOL_CACHE_PATH when it is imported
+    os.environ["TOOL_CACHE_PATH"] = cache_path
+    spec = importlib.util.spec_from_file_location("customer_desk_agent", AGENT_PATH)
+    agent = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(agent)
+    return agent
+
+
+def plan_jobs(agent, config: dict, windows: list) -> list:
+    """Directions first (one lookup serves every date), then hotels nearest window first, so a tight budget covers the soonest peak."""
+    jobs = []
+    for origin, destination in config.get("city_pairs", []):
+        for start, end in ((origin, destination), (destination, origin)):
+            jobs.append({
+                "kind": "directions", "target": f"{start} -> {end}", "window": None,
+                "params": agent._directions_params(start, end),
+            })
+    for check_in, check_out in sorted(windows):
+        for city in config.get("destinations", []):
+            query = f"Hotels in {city}"
+            jobs.append({
+                "kind": "hotels", "target": city, "window": f"{check_in}..{check_out}",
+                "params": agent._hotel_search_params(query, check_in, check_out),
+            })
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", type=Path, default=REPO_ROOT / "scripts" / "popular_routes.json")
+    parser.add_argument("--cache-path", default=os.getenv("TOOL_CACHE_PATH", str(REPO_ROOT / ".cache" / "tool_cache.sqlite3")))
+    parser.add_argument("--weekends", type=int, help="override the number of upcoming weekends in the config")
+    parser.add_argument("--max-calls", type=int, default=100, help="SerpApi call budget for this run")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--ttl-hours", type=float, default=12, help="how long warmed results stay valid")
+    parser.add_argument("--cost-per-call", type=float, default=0.015, help="USD per SerpApi search, for the cost summary")
+    parser.add_argument("--summary", type=Path, help="also write the summary as JSON to this file")
+    args = parser.parse_args()
+
+    config = json.loads(args.config.read_text())
+    today = datetime.datetime.now(ZoneInfo("Asia/Kolkata")).date()
+    windows = upcoming_weekends(config.get("weekends", 0) if args.weekends is None else args.weekends, today)
+    windows += [tuple(window) for window in config.get("date_windows", [])]
+
+    Path(args.cache_path).parent.mkdir(parents=True, exist_ok=True)
+    agent = load_agent(args.cache_path)
+    agent._TOOL_CACHE_TTL_SECONDS = int(args.ttl_hours * 3600)
+
+    jobs = plan_jobs(agent, config, windows)
+    for job in jobs:
+        job["status"] = "already_warm" if agent._tool_cache_has(job["params"]) else "pending"
+    cold = [job for job in jobs if job["status"] == "pending"]
+    for job in cold[args.max_calls:]:
+        job["status"] = "over_budget"
+    to_run = cold[:args.max_calls]
+
+    started = time.monotonic()
+    calls_before = agent._serpapi_call_count
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = {pool.submit(agent._serpapi_get_json, job["params"]): job for job in to_run}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                payload = future.result()
+            except Exception as e:
+                job["status"], job["error"] = "failed", str(e)
+                continue
+            if agent._load_persisted(agent._tool_cache_key(job["params"])):
+                job["status"] = "warmed"
+            else:
+                job["status"] = "failed"
+                job["error"] = payload.get("error") or "SerpApi returned no results, nothing was cached"
+    calls = agent._serpapi_call_count - calls_before
+
+    counts = {}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+    covered = counts.get("warmed", 0) + counts.get("already_warm", 0)
+    summary = {
+        "cache_path": args.cache_path,
+        "date_windows": [f"{check_in}..{check_out}" for check_in, check_out in windows],
+        "lookups_planned": len(jobs),
+        "status_counts": counts,
+        "coverage": round(covered / len(jobs), 3) if jobs else None,
+        "serpapi_calls": calls,
+        "estimated_cost_usd": round(calls * args.cost_per_call, 2),
+        "elapsed_s": round(time.monotonic() - started, 1),
+        "not_covered": [
+            {key: job[key] for key in ("kind", "target", "window", "status", "error") if job.get(key)}
+            for job in jobs if job["status"] not in ("warmed", "already_warm")
+        ],
+    }
+
+    print(f"Warmed {counts.get('warmed', 0)}, already warm {counts.get('already_warm', 0)}, "
+          f"over budget {counts.get('over_budget', 0)}, failed {counts.get('failed', 0)} of {len(jobs)} lookups "
+          f"({summary['coverage'] or 0:.0%} coverage)")
+    print(f"SerpApi calls: {calls}, estimated cost: ${summary['estimated_cost_usd']}")
+    if args.summary:
+        args.summary.write_text(json.dumps(summary, indent=2))
+    return 1 if counts.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())